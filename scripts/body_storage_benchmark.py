@@ -0,0 +1,119 @@
+import pathlib
+import queue
+import tempfile
+import threading
+import time
+import numpy as np
+import h5py
+
+import fast_body_tracker as fbt
+from fast_body_tracker.utils import STORAGE_PROFILES
+
+
+def synthetic_session(
+        n_frames: int, n_devices: int, seed: int = 0) -> tuple[
+            np.ndarray, np.ndarray]:
+    # Smooth joint trajectories with sensor noise, compressibility is close
+    # to real recordings.
+    rng = np.random.default_rng(seed)
+    n_joints = len(fbt.K4ABT_JOINT_NAMES)
+    base = rng.normal(0.0, 300.0, (n_joints, 3)).astype(np.float32)
+    drift = np.cumsum(
+        rng.normal(0.0, 2.0, (n_frames, 1, 3)), axis=0).astype(np.float32)
+    positions = np.empty((n_devices, n_frames, n_joints, 3), dtype=np.float32)
+    for i in range(n_devices):
+        noise = rng.normal(0.0, 3.0, (n_frames, n_joints, 3))
+        positions[i] = base + drift + noise.astype(np.float32)
+    confidences = rng.choice(
+        np.array([1, 2, 2, 2, 2], dtype=np.uint8),
+        size=(n_devices, n_frames, n_joints))
+
+    return positions, confidences
+
+
+def write_session(
+        file_dir: pathlib.Path, profile: str, positions: np.ndarray,
+        confidences: np.ndarray) -> float:
+    n_devices, n_frames = positions.shape[:2]
+    joints_queue = queue.Queue(maxsize=10)
+    flush_monitor = fbt.FlushMonitor()
+    saver_t = threading.Thread(
+        target=fbt.body_saver_thread,
+        args=(
+            joints_queue, file_dir, n_devices, 1, 30*60, False,
+            flush_monitor, profile))
+
+    ids = np.zeros(1, dtype=np.uint32)
+    start_time = time.perf_counter()
+    saver_t.start()
+    for frame_idx in range(n_frames):
+        ts = frame_idx * 33_333
+        for device_id in range(n_devices):
+            joints_queue.put((
+                frame_idx, ts, ts, device_id, ids,
+                positions[device_id, frame_idx:frame_idx + 1],
+                confidences[device_id, frame_idx:frame_idx + 1]))
+    for _ in range(n_devices):
+        joints_queue.put(None)
+    saver_t.join()
+
+    return time.perf_counter() - start_time
+
+
+def read_session(
+        file_path: pathlib.Path, n_devices: int, window_s: float = 10.0,
+        n_windows: int = 100, seed: int = 0) -> tuple[float, float]:
+    rng = np.random.default_rng(seed)
+    with h5py.File(file_path, "r") as h5file:
+        start_time = time.perf_counter()
+        for i in range(n_devices):
+            h5file[f"joints/device_{i}/body_0/positions"][:]
+            h5file[f"joints/device_{i}/body_0/confidences"][:]
+        full_time = time.perf_counter() - start_time
+
+        # The timestamps are read once, so that only the range reads of the
+        # joints are timed.
+        device_ts = [h5file[f"ts/device_{i}/ts"][:] for i in range(n_devices)]
+        start_time = time.perf_counter()
+        for _ in range(n_windows):
+            i = int(rng.integers(n_devices))
+            ts = device_ts[i]
+            start_ts = rng.integers(ts[0], ts[-1])
+            start, end = np.searchsorted(
+                ts, [start_ts, start_ts + int(window_s * 1e6)])
+            body_grp = h5file[f"joints/device_{i}/body_0"]
+            body_grp["positions"][start:end]
+            body_grp["confidences"][start:end]
+        window_time = (time.perf_counter() - start_time) / n_windows
+
+    return full_time, window_time
+
+
+def main(minutes: float = 60.0, n_devices: int = 4, fps: int = 30):
+    n_frames = int(minutes * 60 * fps)
+    positions, confidences = synthetic_session(n_frames, n_devices)
+    raw_mb = (positions.nbytes + confidences.nbytes) / 1e6
+    print(
+        f"{minutes:.0f} min, {n_devices} devices, {n_frames} frames, "
+        f"{raw_mb:.1f} MB of joints")
+
+    print(
+        f"{'profile':>12} {'write s':>8} {'frames/s':>9} {'size MB':>8} "
+        f"{'ratio':>6} {'full read s':>11} {'10 s read ms':>12}")
+    for profile in STORAGE_PROFILES:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_dir = pathlib.Path(tmp_dir)
+            write_time = write_session(
+                file_dir, profile, positions, confidences)
+            file_path = file_dir / "body.h5"
+            size_mb = file_path.stat().st_size / 1e6
+            full_time, window_time = read_session(file_path, n_devices)
+        print(
+            f"{profile:>12} {write_time:8.1f} "
+            f"{n_frames * n_devices / write_time:9.0f} {size_mb:8.1f} "
+            f"{raw_mb / size_mb:6.2f} {full_time:11.2f} "
+            f"{window_time * 1e3:12.2f}")
+
+
+if __name__ == "__main__":
+    main(minutes=60.0, n_devices=4)
@@ -0,0 +1,82 @@
+import ctypes
+import ctypes.util
+import sys
+import timeit
+
+from fast_body_tracker.initializer import _get_k4a_module_path
+from fast_body_tracker.k4a import _k4a_types
+from fast_body_tracker.k4a._k4a import K4aLib
+from fast_body_tracker.k4a.k4a_const import K4A_IMAGE_FORMAT_CUSTOM8
+
+
+def compare(per_call, bound, arg, n_calls: int):
+    results = {
+        "per-call binding": timeit.timeit(
+            lambda: per_call(arg), number=n_calls),
+        "pre-bound": timeit.timeit(lambda: bound(arg), number=n_calls)}
+    for name, seconds in results.items():
+        print(f"{name:>18}: {seconds / n_calls * 1e9:8.1f} ns/call")
+    print(
+        f"{'speedup':>18}: "
+        f"{results['per-call binding'] / results['pre-bound']:8.2f}x")
+
+
+def benchmark_sdk(n_calls: int):
+    # The k4abt and k4arecord functions need a tracker, a device or a
+    # recording. K4abtLib and K4aRecordLib bind like K4aLib, whose image
+    # functions run on an image created in host memory.
+    handle = _k4a_types.k4a_image_t()
+    K4aLib.k4a_image_create(
+        K4A_IMAGE_FORMAT_CUSTOM8, 64, 64, 64, ctypes.byref(handle))
+
+    # Old wrappers: symbol lookup and prototype assignment on every call.
+    def per_call_width(image_handle):
+        _get_width = K4aLib._dll.k4a_image_get_width_pixels
+        _get_width.restype = ctypes.c_int
+        _get_width.argtypes = (_k4a_types.k4a_image_t,)
+        return _get_width(image_handle)
+
+    # New wrappers: the function bound once by K4aLib._bind_all.
+    def bound_width(image_handle):
+        return K4aLib.k4a_image_get_width_pixels(image_handle)
+
+    print("k4a_image_get_width_pixels")
+    compare(per_call_width, bound_width, handle, n_calls)
+    K4aLib.k4a_image_release(handle)
+
+
+def benchmark_libc(n_calls: int):
+    # Without the SDK, only the generic ctypes call overhead is measured.
+    if sys.platform == "win32":
+        dll = ctypes.CDLL("msvcrt")
+    else:
+        dll = ctypes.CDLL(ctypes.util.find_library("c"))
+
+    def per_call_abs(value):
+        _abs = dll.abs
+        _abs.restype = ctypes.c_int
+        _abs.argtypes = (ctypes.c_int,)
+        return _abs(value)
+
+    bound_abs = dll.abs
+    bound_abs.restype = ctypes.c_int
+    bound_abs.argtypes = (ctypes.c_int,)
+
+    class Lib:
+        abs = bound_abs
+
+    print("Azure Kinect SDK not found, generic ctypes overhead with libc abs")
+    compare(per_call_abs, Lib.abs, -1, n_calls)
+
+
+def main(n_calls: int = 1_000_000):
+    try:
+        K4aLib.setup(_get_k4a_module_path())
+    except OSError:
+        benchmark_libc(n_calls)
+        return
+    benchmark_sdk(n_calls)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+import numpy as np
+import pathlib
+
+import fast_body_tracker as fbt
+
+
+def main(
+        base_dir: pathlib.Path | str, n_bodies: int = 1,
+        codec_profile: str = "auto"):
+    # No windows, stop with Ctrl+C or SIGTERM (e.g. systemctl stop).
+    trans_matrices_path = base_dir / "trans_matrices.npz"
+    with np.load(trans_matrices_path) as data:
+        trans_matrices = {int(k): v for k, v in data.items()}
+    fbt.default_pipeline(
+        base_dir=base_dir, trans_matrices=trans_matrices, sync=True,
+        n_bodies=n_bodies, codec_profile=codec_profile, headless=True)
+
+
+if __name__ == "__main__":
+    base_dir = pathlib.Path("../data/")
+    main(base_dir=base_dir, n_bodies=1)
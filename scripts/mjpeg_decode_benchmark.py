@@ -0,0 +1,57 @@
+import time
+import numpy as np
+import cv2
+
+from fast_body_tracker.utils import MjpegDecoder
+
+
+def synthetic_jpeg(width: int, height: int, seed: int = 0) -> bytes:
+    # Smooth gradients with noise, close to the size of a camera JPEG.
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    image = np.stack([x + 0 * y, y + 0 * x, (x + y) / 2], axis=-1)
+    image += rng.normal(0.0, 8.0, image.shape).astype(np.float32)
+    _, jpeg = cv2.imencode(
+        ".jpg", np.clip(image, 0, 255).astype(np.uint8),
+        [cv2.IMWRITE_JPEG_QUALITY, 90])
+
+    return jpeg.tobytes()
+
+
+def run(
+        jpeg: bytes, width: int, height: int, n_cameras: int, scale: int,
+        n_workers: int, n_frames: int) -> float:
+    with MjpegDecoder(n_workers=n_workers, scale=scale) as decoder:
+        shape = decoder.output_shape(width, height)
+        outputs = [
+            np.empty(shape, dtype=np.uint8) for _ in range(n_cameras)]
+        start_time = time.perf_counter()
+        for _ in range(n_frames):
+            futures = [
+                decoder.submit(jpeg, outputs[i]) for i in range(n_cameras)]
+            for future in futures:
+                future.result()
+        elapsed = time.perf_counter() - start_time
+
+    return n_frames / elapsed
+
+
+def main(
+        width: int = 3840, height: int = 2160, n_cameras: int = 4,
+        n_frames: int = 60):
+    # Framesets per second, every camera of the frameset decoded.
+    jpeg = synthetic_jpeg(width, height)
+    print(
+        f"{width}x{height}, {n_cameras} cameras, "
+        f"{len(jpeg) / 1e6:.2f} MB per JPEG")
+    print(f"{'scale':>5} {'workers':>7} {'framesets/s':>11}")
+    for scale in (1, 2, 4):
+        for n_workers in (1, n_cameras):
+            fps = run(
+                jpeg, width, height, n_cameras, scale, n_workers, n_frames)
+            print(f"{scale:>5} {n_workers:>7} {fps:11.1f}")
+
+
+if __name__ == "__main__":
+    main(width=3840, height=2160, n_cameras=4)
@@ -0,0 +1,22 @@
+import pathlib
+
+import fast_body_tracker as fbt
+
+
+def main(session_dir: pathlib.Path | str, storage_profile: str = "none"):
+    # Salvages the journal of an interrupted session into body.h5.
+    session_dir = pathlib.Path(session_dir)
+    journal_dir = session_dir / "journal"
+    n_records = fbt.recover_journal(journal_dir)
+    info = fbt.journal_info(journal_dir)
+    print(
+        f"{n_records} records recovered, devices: {info['device_ids']}, "
+        f"bodies per record: {info['max_bodies']}")
+    fbt.journal_to_h5(
+        journal_dir, session_dir, storage_profile=storage_profile,
+        recover=False)
+
+
+if __name__ == "__main__":
+    session_dir = pathlib.Path("../data/2025_01_01_00_00/")
+    main(session_dir=session_dir)
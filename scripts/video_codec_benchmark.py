@@ -0,0 +1,100 @@
+import pathlib
+import queue
+import tempfile
+import threading
+import time
+import numpy as np
+import av
+
+import fast_body_tracker as fbt
+from fast_body_tracker.utils import available_codec_profiles
+
+
+def synthetic_frames(
+        n_frames: int, width: int, height: int, seed: int = 0) -> list[
+            np.ndarray]:
+    # A noisy background with a moving block, so the encoders cannot skip
+    # every macroblock.
+    rng = np.random.default_rng(seed)
+    background = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+    frames = []
+    for i in range(n_frames):
+        frame = background.copy()
+        x = (i * 16) % (width - 200)
+        frame[100:300, x:x + 200] = 255
+        frames.append(frame)
+
+    return frames
+
+
+def muxed_frames(filename: pathlib.Path) -> int:
+    with av.open(str(filename)) as container:
+        return sum(
+            packet.size > 0 for packet in container.demux(video=0))
+
+
+def encode(
+        file_dir: pathlib.Path, profile: str, frames: list[np.ndarray],
+        n_devices: int, n_frames: int) -> tuple[float, int]:
+    height, width = frames[0].shape[:2]
+    # One encoder per device fed through a blocking queue. The dispatch of
+    # video_saver_thread drops the oldest frames of a device that falls
+    # behind, which would inflate the fps.
+    device_queues = dict()
+    encoder_t = dict()
+    for i in range(n_devices):
+        device_queues[i] = queue.Queue(maxsize=10)
+        encoder_t[i] = threading.Thread(
+            target=fbt.video_encoder_thread,
+            args=(
+                device_queues[i], file_dir / f"device_{i}.mkv", profile, 30,
+                width, height))
+
+    start_time = time.perf_counter()
+    for t in encoder_t.values():
+        t.start()
+    for i in range(n_frames):
+        for device_id in range(n_devices):
+            device_queues[device_id].put((
+                frames[i % len(frames)], device_id, i,
+                time.perf_counter_ns()))
+    for device_id in range(n_devices):
+        device_queues[device_id].put(None)
+    for t in encoder_t.values():
+        t.join()
+    elapsed = time.perf_counter() - start_time
+
+    # The slowest device sets the sustainable rate.
+    n_muxed = min(
+        muxed_frames(file_dir / f"device_{i}.mkv") for i in range(n_devices))
+
+    return elapsed, n_muxed
+
+
+def main(
+        n_frames: int = 300, device_counts: tuple[int, ...] = (1, 3),
+        width: int = 1920, height: int = 1080):
+    # Sustainable fps per device: frames muxed per second of wall time
+    # with every device encoding in parallel. Missing frames are shown
+    # next to the fps.
+    frames = synthetic_frames(30, width, height)
+    profiles = available_codec_profiles()
+    print(f"Available profiles: {', '.join(profiles)}")
+    print(f"{'profile':<22}" + "".join(
+        f"{f'{n} dev fps':>14}" for n in device_counts))
+    for profile in profiles:
+        row = f"{profile:<22}"
+        for n_devices in device_counts:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                elapsed, n_muxed = encode(
+                    pathlib.Path(tmp_dir), profile, frames, n_devices,
+                    n_frames)
+            cell = f"{n_muxed / elapsed:.1f}"
+            if n_muxed < n_frames:
+                cell += f" (-{n_frames - n_muxed})"
+            row += f"{cell:>14}"
+        print(row, flush=True)
+
+
+if __name__ == "__main__":
+    main(n_frames=300, device_counts=(1, 3), width=1920, height=1080)
@@ -2,7 +2,11 @@ from .initializer import (
     initialize_libraries, start_device, start_body_tracker, start_playback)
 from .data_capture_pipeline import (
     body_saver_thread, capture_thread, computation_thread, default_pipeline,
-    video_saver_thread, visualization_main_tread)
+    device_process, journal_saver_thread, journal_to_h5,
+    mosaic_visualization_main_thread, multiprocess_pipeline,
+    ring_collector_thread, ring_computation_thread,
+    synchronizer_thread, video_encoder_thread, video_saver_thread,
+    visualization_main_tread)
 from .calibration import *
 from .utils import *
 from .k4a import *
@@ -1,138 +1,663 @@
+from collections import deque
 import threading
 import queue
+import signal
+import time
+import multiprocessing as mp
 import numpy as np
 from numpy import typing as npt
 import cv2
 import av
 import pathlib
 import h5py
-import tkinter as tk
 from datetime import datetime
 
 from .initializer import initialize_libraries, start_device, start_body_tracker
 from .utils.performace_calculator import (
-    DroppedFramesAlert, FrameRateCalculator)
+    DroppedFramesAlert, FlushMonitor, FrameRateCalculator)
+from .utils.frame_pool import FramePool
+from .utils.frame_synchronizer import FrameSynchronizer
+from .utils.frame_tracer import TRACER
+from .utils.codec_profiles import (
+    MJPEG_PASSTHROUGH, add_passthrough_stream, add_video_stream,
+    mjpeg_packet, select_codec_profile)
+from .utils.identity_association import IdentityAssociator
+from .utils.metrics import REGISTRY, MetricsExporter
+from .utils.mjpeg_decoder import MjpegDecoder
+from .utils.mosaic_preview import MosaicPreview
+from .utils.joint_journal import (
+    JointJournal, journal_info, read_journal, recover_journal)
+from .utils.skeleton_fusion import fuse_skeletons
+from .utils.storage_profiles import check_storage_profile, dataset_options
+from .utils.shared_frame_ring import SharedFrameRing
+from .utils.tracking_decimator import TrackingDecimator
+from .utils.yuv_frames import YUV_FORMATS, yuv_preview, yuv_video_frame
 from .k4a.k4a_const import (
-    K4A_CALIBRATION_TYPE_COLOR, K4A_WIRED_SYNC_MODE_STANDALONE,
-    K4A_WIRED_SYNC_MODE_MASTER, K4A_WIRED_SYNC_MODE_SUBORDINATE,
-    K4A_IMAGE_FORMAT_COLOR_BGRA32, K4A_COLOR_RESOLUTION_1080P,
-    K4A_DEPTH_MODE_WFOV_2X2BINNED)
+    K4A_CALIBRATION_TYPE_COLOR, K4A_CALIBRATION_TYPE_DEPTH,
+    K4A_WIRED_SYNC_MODE_STANDALONE, K4A_WIRED_SYNC_MODE_MASTER,
+    K4A_WIRED_SYNC_MODE_SUBORDINATE,
+    K4A_IMAGE_FORMAT_COLOR_BGRA32, K4A_IMAGE_FORMAT_COLOR_MJPG,
+    K4A_IMAGE_FORMAT_COLOR_NV12, K4A_IMAGE_FORMAT_COLOR_YUY2,
+    K4A_COLOR_RESOLUTION_720P, K4A_COLOR_RESOLUTION_1080P,
+    K4A_COLOR_RESOLUTION_1440P, K4A_COLOR_RESOLUTION_1536P,
+    K4A_COLOR_RESOLUTION_2160P, K4A_COLOR_RESOLUTION_3072P,
+    K4A_DEPTH_MODE_WFOV_2X2BINNED, K4A_FRAMES_PER_SECOND_5,
+    K4A_FRAMES_PER_SECOND_15, K4A_FRAMES_PER_SECOND_30)
 from .k4a.calibration import Calibration
 from .k4a.configuration import Configuration
 from .k4a.device import Device
 from .k4abt.kabt_const import K4ABT_JOINT_NAMES, K4ABT_SEGMENT_PAIRS
 from .k4abt.body import draw_body
+from .k4abt.frame import empty_bodies_array
 from .k4abt.tracker import Tracker
 
+# Device id of the fused skeletons in the joints items.
+FUSED_DEVICE_ID = -1
+# Color image width and resolution by image height.
+COLOR_RESOLUTIONS = {
+    720: (1280, K4A_COLOR_RESOLUTION_720P),
+    1080: (1920, K4A_COLOR_RESOLUTION_1080P),
+    1440: (2560, K4A_COLOR_RESOLUTION_1440P),
+    1536: (2048, K4A_COLOR_RESOLUTION_1536P),
+    2160: (3840, K4A_COLOR_RESOLUTION_2160P),
+    3072: (4096, K4A_COLOR_RESOLUTION_3072P)}
+# Frame rate of the camera_fps settings.
+CAMERA_FPS = {
+    K4A_FRAMES_PER_SECOND_5: 5, K4A_FRAMES_PER_SECOND_15: 15,
+    K4A_FRAMES_PER_SECOND_30: 30}
+INGEST_FORMATS = {
+    "bgra": K4A_IMAGE_FORMAT_COLOR_BGRA32,
+    "nv12": K4A_IMAGE_FORMAT_COLOR_NV12, "yuy2": K4A_IMAGE_FORMAT_COLOR_YUY2}
+# Frames older than these ages (ms since exposure) are shed by the
+# degradable sinks. The joints are critical and never shed by age.
+DEFAULT_MAX_AGE_MS = {"video": 2000.0, "visualization": 200.0}
+
+
+def _color_resolution(width: int, height: int) -> int:
+    # The frame pools, rings and video streams are sized from width and
+    # height, which must be the size of the device images.
+    if COLOR_RESOLUTIONS.get(height, (None,))[0] != width:
+        sizes = ", ".join(
+            f"{w}x{h}" for h, (w, _) in COLOR_RESOLUTIONS.items())
+        raise ValueError(
+            f"Unsupported color size {width}x{height}, supported sizes: "
+            f"{sizes}.")
+
+    return COLOR_RESOLUTIONS[height][1]
+
 
 def capture_thread(
         device: Device, tracker: Tracker | None, capture_queue: queue.Queue,
-        stop_event: threading.Event):
-    frc = FrameRateCalculator()
-    dfa = DroppedFramesAlert()
-
-    frc.start()
-    while not stop_event.is_set():
-        capture = device.update()
-        if tracker is not None:
-            frame = tracker.update(capture=capture)
+        stop_event: threading.Event, device_id: int | None = None,
+        decimator: TrackingDecimator | None = None):
+    frc = FrameRateCalculator("capture", device_id)
+    dfa = DroppedFramesAlert("capture", device_id)
+    capture_latency = REGISTRY.histogram(
+        "fbt_stage_seconds", "capture", device_id)
+    tracker_latency = REGISTRY.histogram(
+        "fbt_stage_seconds", "tracker", device_id)
+    stride = REGISTRY.gauge("fbt_tracking_stride", "tracker", device_id)
+    stride.set(1)
+
+    def put(item):
         if capture_queue.full():
             dfa.update()
             try:
                 capture_queue.get_nowait()
             except queue.Empty:
                 pass
-        if tracker is not None:
-            capture_queue.put((capture, frame))
-        else:
-            capture_queue.put(capture)
-        frc.update()
+        capture_queue.put(item)
+
+    # Captures in acquisition order as [capture, frame, tracked,
+    # tracked_ns]. Skipped captures have no frame and wait behind the
+    # tracked ones before them.
+    pending = deque()
+
+    def pop():
+        _, frame = tracker.pop()
+        tracked_ns = time.perf_counter_ns()
+        # The tracker returns its captures in order.
+        for entry in pending:
+            if entry[2] and entry[1] is None:
+                entry[1] = frame
+                entry[3] = tracked_ns
+                break
+
+    def put_ready():
+        while pending and (pending[0][1] is not None or not pending[0][2]):
+            capture, frame, _, tracked_ns = pending.popleft()
+            put((capture, frame, tracked_ns))
+            frc.update()
+
+    frc.start()
+    while not stop_event.is_set():
+        start_time = time.perf_counter()
+        capture = device.update()
+        capture_latency.observe(time.perf_counter() - start_time)
+        if tracker is None:
+            put(capture)
+            frc.update()
+            continue
+        if decimator is not None and not decimator.track_next():
+            pending.append([capture, None, False, None])
+            put_ready()
+            continue
+        # Keep up to max_in_flight captures inside the tracker, so the next
+        # acquisition overlaps with the inference of the previous ones.
+        start_time = time.perf_counter()
+        tracker.enqueue(capture)
+        pending.append([capture, None, True, None])
+        if tracker.is_full():
+            pop()
+        tracker_s = time.perf_counter() - start_time
+        tracker_latency.observe(tracker_s)
+        if decimator is not None:
+            decimator.update(tracker_s)
+            stride.set(decimator.stride)
+        put_ready()
+    if tracker is not None:
+        while tracker.n_in_flight:
+            pop()
+        put_ready()
     capture_queue.put(None)
 
 
+class _CheckedThread(threading.Thread):
+    # Keeps the exception of its target, so that the joining thread raises
+    # it once the other stages are finished.
+    error = None
+
+    def run(self):
+        try:
+            super().run()
+        except Exception as e:
+            self.error = e
+
+    def raise_error(self):
+        if self.error is not None:
+            raise self.error
+
+
+def _put_drop_oldest(
+        target_queue: queue.Queue, item: tuple,
+        frame_pool: FramePool | None = None) -> bool:
+    dropped = False
+    if target_queue.full():
+        try:
+            old_item = target_queue.get_nowait()
+            dropped = True
+            if frame_pool is not None and old_item is not None:
+                frame_pool.release(old_item[0])
+        except queue.Empty:
+            pass
+    target_queue.put(item)
+
+    return dropped
+
+
+def _is_stale(system_ts: int, max_age_ms: float | None) -> bool:
+    # The system timestamps of the SDK use the perf_counter clock.
+    return (
+        max_age_ms is not None
+        and time.perf_counter_ns() - system_ts > max_age_ms * 1e6)
+
+
+def _is_interpolated(item: tuple) -> bool:
+    # Joints items may end with the interpolated flag of their frame.
+    return len(item) > 7 and bool(item[7])
+
+
+def _interpolate_bodies(
+        prev: tuple, next_: tuple, ts: int) -> tuple[
+            npt.NDArray[np.uint32], npt.NDArray[np.float64],
+            npt.NDArray[np.uint8]]:
+    # (ts, ids, positions, confidences) of the tracked frames around ts.
+    # Only the bodies tracked in both frames are interpolated, linearly in
+    # the device time, with the lowest of their two confidences.
+    prev_ts, prev_ids, prev_positions, prev_confidences = prev
+    next_ts, next_ids, next_positions, next_confidences = next_
+    ids, prev_idx, next_idx = np.intersect1d(
+        prev_ids, next_ids, return_indices=True)
+    weight = (ts - prev_ts) / max(next_ts - prev_ts, 1)
+    positions = (
+        (1.0 - weight) * prev_positions[prev_idx]
+        + weight * next_positions[next_idx])
+    confidences = np.minimum(
+        prev_confidences[prev_idx], next_confidences[next_idx])
+
+    return ids, positions, confidences
+
+
 def computation_thread(
         device_id: int, calibration: Calibration,
         capture_queue: queue.Queue, joints_queue: queue.Queue,
-        video_queue: queue.Queue, visualization_queue: queue.Queue,
+        video_queue: queue.Queue, visualization_queue: queue.Queue | None,
         ext_rot: npt.NDArray[np.float64] | None = None,
-        ext_trans: npt.NDArray[np.float64] | None = None):
-    dfa = DroppedFramesAlert()
+        ext_trans: npt.NDArray[np.float64] | None = None,
+        frame_pool: FramePool | None = None, max_bodies: int = 10,
+        color_format: int = K4A_IMAGE_FORMAT_COLOR_BGRA32,
+        decoder: MjpegDecoder | None = None, preview_scale: int = 1,
+        max_age_ms: dict[str, float] | None = None):
+    # Drops are counted by the queue that overflowed, sheds by the sink
+    # the frame was too old for.
+    dfa = {
+        stage: DroppedFramesAlert(stage, device_id)
+        for stage in ("joints", "video", "visualization", "decode")}
+    shed = {
+        stage: REGISTRY.counter("fbt_shed_frames_total", stage, device_id)
+        for stage in ("video", "visualization")}
+    if max_age_ms is None:
+        max_age_ms = dict()
+    latency = REGISTRY.histogram("fbt_stage_seconds", "computation", device_id)
+    interpolated = REGISTRY.counter(
+        "fbt_interpolated_frames_total", "joints", device_id)
+    passthrough = color_format == K4A_IMAGE_FORMAT_COLOR_MJPG
+    yuv = color_format in YUV_FORMATS
+    own_decoder = passthrough and decoder is None
+    if own_decoder:
+        decoder = MjpegDecoder(n_workers=1, scale=preview_scale)
+    if passthrough:
+        preview_scale = decoder.scale
+    # The pool only holds the video frames in BGRA ingest.
+    video_pool = None if passthrough or yuv else frame_pool
+    projector = calibration.get_projector(
+        K4A_CALIBRATION_TYPE_DEPTH, K4A_CALIBRATION_TYPE_COLOR)
+    ids, joints = empty_bodies_array(max_bodies)
+    no_ids = np.zeros(0, dtype=ids.dtype)
+    no_positions = np.zeros((0, joints.shape[1], 3))
+    no_confidences = np.zeros((0, joints.shape[1]), dtype=np.uint8)
+
+    def put_joints(item: tuple):
+        if _put_drop_oldest(joints_queue, item):
+            dfa["joints"].update()
+
+    # Captures skipped by the tracker are held as (frame_idx, ts,
+    # system_ts) until the next tracked frame, their joints are then
+    # interpolated from the tracked frames around them.
+    held = []
+    last_tracked = None
+    positions_2d = None
 
     frame_idx = 0
     while True:
         item = capture_queue.get()
         if item is None:
             break
-        capture, frame = item
+        capture, frame, tracked_ns = item
+        start_time = time.perf_counter()
 
         color_image_object = capture.get_color_image_object()
         ts = color_image_object.timestamp
         system_ts = color_image_object.system_timestamp
-        bgra_image = color_image_object.to_numpy()
 
-        bodies = []
-        for body_idx in range(frame.get_num_bodies()):
-            body = frame.get_body(body_idx)
-            positions_2d = body.get_2d_positions(
-                calibration=calibration,
-                target_camera=K4A_CALIBRATION_TYPE_COLOR)
-            draw_body(bgra_image, positions_2d, body.id)
+        # A frame already too old for a degradable sink is not prepared
+        # for it, so an overloaded pipeline keeps its time for the joints.
+        send_video = not _is_stale(system_ts, max_age_ms.get("video"))
+        send_preview = visualization_queue is not None and not _is_stale(
+            system_ts, max_age_ms.get("visualization"))
+        if not send_video:
+            shed["video"].inc()
+        if visualization_queue is not None and not send_preview:
+            shed["visualization"].inc()
+
+        # With passthrough, the camera JPEG is recorded as it is and the
+        # pixels are decoded only for the visualization, by the decoder
+        # pool while the bodies are read.
+        bgr_image = None
+        decoding = None
+        if passthrough and (send_video or send_preview):
+            jpeg = color_image_object.to_bytes()
+            video_ref = (jpeg, ts)
+            if send_preview:
+                frame_ref = None
+                if frame_pool is not None:
+                    frame_ref = frame_pool.acquire(n_refs=1)
+                decoding = decoder.submit(
+                    jpeg,
+                    None if frame_pool is None else frame_pool[frame_ref])
+        elif yuv and (send_video or send_preview):
+            # The camera planes go to the encoder without conversion, the
+            # overlay is only drawn on the preview.
+            yuv_image = color_image_object.to_numpy(raw=True)
+            if send_video:
+                video_ref = yuv_video_frame(yuv_image, color_format)
+            if send_preview:
+                if frame_pool is None:
+                    bgr_image = yuv_preview(
+                        yuv_image, color_format, preview_scale)
+                    frame_ref = bgr_image
+                else:
+                    frame_ref = frame_pool.acquire(n_refs=1)
+                    bgr_image = yuv_preview(
+                        yuv_image, color_format, preview_scale,
+                        out=frame_pool[frame_ref])
+        elif not (passthrough or yuv) and (send_video or send_preview):
+            bgra_image = color_image_object.to_numpy()
+            # With a pool, the frame is written into a preallocated slot
+            # shared by the video and the visualization consumers.
+            if frame_pool is None:
+                bgr_image = cv2.cvtColor(bgra_image, cv2.COLOR_BGRA2BGR)
+                frame_ref = bgr_image
+            else:
+                frame_ref = frame_pool.acquire(
+                    n_refs=int(send_video) + int(send_preview))
+                bgr_image = cv2.cvtColor(
+                    bgra_image, cv2.COLOR_BGRA2BGR,
+                    dst=frame_pool[frame_ref])
+            video_ref = frame_ref
+
+        # All the bodies are read and projected as whole-frame arrays.
+        tracked = frame is not None
+        if tracked:
+            n_bodies = frame.get_bodies_array(ids, joints)
+            positions = joints["position"][:n_bodies]
+            positions_2d = None
+            if n_bodies and (bgr_image is not None or decoding is not None):
+                positions_2d, _ = projector.project(positions)
+                if preview_scale != 1:
+                    positions_2d = positions_2d / preview_scale
+                overlay_ids = ids[:n_bodies].copy()
+        if decoding is not None:
+            try:
+                bgr_image = decoding.result()
+                if frame_pool is None:
+                    frame_ref = bgr_image
+            except ValueError:
+                # A corrupt JPEG is only missing from the visualization.
+                dfa["decode"].update()
+                if frame_pool is not None:
+                    frame_pool.release(frame_ref)
+        # A skipped frame is shown with the bodies of the last tracked one.
+        if positions_2d is not None and bgr_image is not None:
+            for body_idx, person_id in enumerate(overlay_ids):
+                draw_body(bgr_image, positions_2d[body_idx], int(person_id))
+
+        if tracked:
             if ext_rot is not None:
-                body.positions[:] = body.positions @ ext_rot.T
-                body.positions[:] += (ext_trans * 1000.0)
-            bodies.append(body)
+                positions = positions @ ext_rot.T
+                positions += (ext_trans * 1000.0)
+            else:
+                positions = positions.copy()
+            confidences = joints["confidence"][:n_bodies].astype(np.uint8)
+            current = (ts, ids[:n_bodies].copy(), positions, confidences)
+            # The held frames go first, the joints stay in frame order.
+            for held_idx, held_ts, held_system_ts in held:
+                if last_tracked is None:
+                    bodies = (no_ids, no_positions, no_confidences)
+                else:
+                    bodies = _interpolate_bodies(
+                        last_tracked, current, held_ts)
+                put_joints((
+                    held_idx, held_ts, held_system_ts, device_id, *bodies,
+                    True))
+                interpolated.inc()
+            held.clear()
+            put_joints(
+                (frame_idx, ts, system_ts, device_id, *current[1:], False))
+            last_tracked = current
+        else:
+            held.append((frame_idx, ts, system_ts))
+        if send_video and _put_drop_oldest(
+                video_queue, (video_ref, device_id, frame_idx, system_ts),
+                video_pool):
+            dfa["video"].update()
+        if send_preview and bgr_image is not None and _put_drop_oldest(
+                visualization_queue, (frame_ref, device_id, system_ts),
+                frame_pool):
+            dfa["visualization"].update()
+        latency.observe(time.perf_counter() - start_time)
+        TRACER.mark("exposure", device_id, frame_idx, system_ts)
+        if tracked:
+            TRACER.mark("tracked", device_id, frame_idx, tracked_ns)
+        TRACER.mark("computed", device_id, frame_idx)
 
-        if joints_queue.full():
+        frame_idx += 1
+    # Nothing to interpolate towards, the last held frames have no bodies.
+    for held_idx, held_ts, held_system_ts in held:
+        put_joints((
+            held_idx, held_ts, held_system_ts, device_id, no_ids,
+            no_positions, no_confidences, True))
+        interpolated.inc()
+    joints_queue.put(None)
+    video_queue.put(None)
+    if visualization_queue is not None:
+        visualization_queue.put(None)
+    if own_decoder:
+        decoder.close()
+
+
+def ring_computation_thread(
+        calibration: Calibration, capture_queue: queue.Queue,
+        frame_ring: SharedFrameRing,
+        ext_rot: npt.NDArray[np.float64] | None = None,
+        ext_trans: npt.NDArray[np.float64] | None = None,
+        max_bodies: int = 10, device_id: int | None = None):
+    dfa = DroppedFramesAlert("ring", device_id)
+    projector = calibration.get_projector(
+        K4A_CALIBRATION_TYPE_DEPTH, K4A_CALIBRATION_TYPE_COLOR)
+    ids, joints = empty_bodies_array(max(max_bodies, frame_ring.n_bodies))
+
+    frame_idx = 0
+    while True:
+        item = capture_queue.get()
+        if item is None:
+            break
+        capture, frame, _ = item
+
+        color_image_object = capture.get_color_image_object()
+        bgra_image = color_image_object.to_numpy()
+
+        slot, dropped = frame_ring.acquire()
+        if dropped:
             dfa.update()
+        meta = frame_ring.meta[slot]
+        meta["frame_idx"] = frame_idx
+        meta["ts"] = color_image_object.timestamp
+        meta["system_ts"] = color_image_object.system_timestamp
+        # Draw on the converted slot, the native buffer is only read.
+        bgr_image = cv2.cvtColor(
+            bgra_image, cv2.COLOR_BGRA2BGR, dst=frame_ring.images[slot])
+
+        n_bodies = frame.get_bodies_array(ids, joints)
+        positions = joints["position"][:n_bodies]
+        if n_bodies:
+            positions_2d, _ = projector.project(positions)
+        for body_idx in range(n_bodies):
+            draw_body(bgr_image, positions_2d[body_idx], int(ids[body_idx]))
+
+        n_bodies = min(n_bodies, frame_ring.n_bodies)
+        positions = positions[:n_bodies]
+        if ext_rot is not None:
+            positions = positions @ ext_rot.T
+            positions += (ext_trans * 1000.0)
+        frame_ring.positions[slot, :n_bodies] = positions
+        frame_ring.ids[slot, :n_bodies] = ids[:n_bodies]
+        frame_ring.confidences[slot, :n_bodies] = (
+            joints["confidence"][:n_bodies])
+        meta["n_bodies"] = n_bodies
+        frame_ring.publish(slot)
+
+        frame_idx += 1
+    frame_ring.close_writer()
+
+
+def ring_collector_thread(
+        device_id: int, frame_ring: SharedFrameRing,
+        joints_queue: queue.Queue, video_queue: queue.Queue,
+        visualization_queue: queue.Queue,
+        process: mp.Process | None = None,
+        stop_event: threading.Event | None = None):
+    dfa = {
+        stage: DroppedFramesAlert(stage, device_id)
+        for stage in ("joints", "video", "visualization")}
+
+    while True:
+        # Checked before the wait, a process that exited has already sent
+        # everything it published.
+        exited = process is not None and process.exitcode is not None
+        try:
+            slot = frame_ring.get(timeout=1.0)
+        except queue.Empty:
+            if not exited:
+                continue
+            # The device process died without closing its ring, the
+            # session is stopped.
+            print(
+                f"Device {device_id} process exited with code "
+                f"{process.exitcode}.")
+            if stop_event is not None:
+                stop_event.set()
+            break
+        if slot is None:
+            break
+
+        meta = frame_ring.meta[slot]
+        n_bodies = int(meta["n_bodies"])
+
+        if joints_queue.full():
+            dfa["joints"].update()
             try:
                 joints_queue.get_nowait()
             except queue.Empty:
                 pass
-        joints_queue.put((frame_idx, ts, system_ts, device_id, bodies))
-
-        bgr_image = cv2.cvtColor(bgra_image, cv2.COLOR_BGRA2BGR)
+        joints_queue.put((
+            int(meta["frame_idx"]), int(meta["ts"]), int(meta["system_ts"]),
+            device_id, frame_ring.ids[slot, :n_bodies].copy(),
+            frame_ring.positions[slot, :n_bodies].copy(),
+            frame_ring.confidences[slot, :n_bodies].copy()))
+
+        # Encoding needs its own frame anyway, build it straight from the
+        # shared memory.
+        video_frame = av.VideoFrame.from_ndarray(
+            frame_ring.images[slot], format="bgr24")
         if video_queue.full():
-            dfa.update()
+            dfa["video"].update()
             try:
                 video_queue.get_nowait()
             except queue.Empty:
                 pass
-        video_queue.put((bgr_image, device_id))
+        video_queue.put((
+            video_frame, device_id, int(meta["frame_idx"]),
+            int(meta["system_ts"])))
 
         if visualization_queue.full():
-            dfa.update()
+            dfa["visualization"].update()
             try:
                 visualization_queue.get_nowait()
             except queue.Empty:
                 pass
-        visualization_queue.put((bgr_image, device_id))
+        visualization_queue.put((
+            frame_ring.images[slot].copy(), device_id,
+            int(meta["system_ts"])))
 
-        frame_idx += 1
+        frame_ring.release(slot)
     joints_queue.put(None)
     video_queue.put(None)
     visualization_queue.put(None)
 
 
+def synchronizer_thread(
+        joints_queue: queue.Queue, saver_queue: queue.Queue,
+        frameset_queue: queue.Queue | None, synchronizer: FrameSynchronizer,
+        associator: IdentityAssociator | None = None, fuse: bool = False):
+    dfa = DroppedFramesAlert("synchronizer")
+
+    def put(target_queue: queue.Queue, item: tuple):
+        if _put_drop_oldest(target_queue, item):
+            dfa.update()
+
+    def emit(framesets: list[tuple]):
+        for frameset in framesets:
+            if associator is not None:
+                frameset, fused_item = _associate_frameset(
+                    frameset, associator, fuse)
+                # The results are saved with their global person ids.
+                for item in frameset[2]:
+                    if item is not None:
+                        put(saver_queue, item)
+                if fused_item is not None:
+                    put(saver_queue, fused_item)
+            if frameset_queue is not None:
+                put(frameset_queue, frameset)
+
+    finished_workers = 0
+    while finished_workers < synchronizer.n_devices:
+        item = joints_queue.get()
+        if item is None:
+            finished_workers += 1
+            continue
+        if associator is None:
+            put(saver_queue, item)
+        emit(synchronizer.push(item[3], item[1], item))
+
+    for device_id in range(synchronizer.n_devices):
+        emit(synchronizer.close(device_id))
+    for _ in range(synchronizer.n_devices):
+        saver_queue.put(None)
+    if frameset_queue is not None:
+        frameset_queue.put(None)
+
+
+def _associate_frameset(
+        frameset: tuple, associator: IdentityAssociator,
+        fuse: bool = False) -> tuple[tuple, tuple | None]:
+    frameset_idx, ts, items, present = frameset
+    views = [
+        None if item is None else (item[5], item[6]) for item in items]
+    view_ids, person_ids, positions, confidences = associator.update(views)
+    items = [
+        None if item is None else (*item[:4], ids, *item[5:])
+        for item, ids in zip(items, view_ids)]
+
+    fused_item = None
+    if fuse:
+        fused_positions, fused_confidences = fuse_skeletons(
+            positions, confidences)
+        system_ts = items[int(np.argmax(present))][2]
+        fused_item = (
+            frameset_idx, ts, system_ts, FUSED_DEVICE_ID, person_ids,
+            fused_positions, fused_confidences,
+            any(_is_interpolated(item) for item in items if item is not None))
+
+    return (frameset_idx, ts, items, present), fused_item
+
+
 def body_saver_thread(
         joints_queue: queue.Queue, file_dir: pathlib.Path,
-        n_devices: int = 1, n_bodies: int = 1, flush_size: int = 30*60):
+        n_devices: int = 1, n_bodies: int = 1, flush_size: int = 30*60,
+        fused: bool = False, flush_monitor: FlushMonitor | None = None,
+        storage_profile: str = "none",
+        stop_event: threading.Event | None = None):
     n_joints = len(K4ABT_JOINT_NAMES)
     h5file = h5py.File(file_dir / "body.h5", "w", libver="latest")
-
-    joint_buffers = {
-        (i, j): {
-            "frame_idx": np.empty(flush_size, dtype=np.int64),
-            "positions": np.empty((flush_size, n_joints, 3), dtype=np.float32),
-            "confidences": np.empty((flush_size, n_joints), dtype=np.uint8),
-            "idx": 0}
-        for i in range(n_devices) for j in range(n_bodies)
-        }
-    ts_buffers = {
-        i: {
-            "ts": np.empty(flush_size, dtype=np.uint64),
-            "system_ts": np.empty(flush_size, dtype=np.uint64),
-            "idx": 0}
-        for i in range(n_devices)}
+    h5file.attrs["storage_profile"] = storage_profile
+    # The fused skeletons are saved like one more device.
+    sources = list(range(n_devices))
+    if fused:
+        sources.append(FUSED_DEVICE_ID)
+
+    def new_buffer_set() -> tuple[dict, dict]:
+        joint_buffers = {
+            (i, j): {
+                "frame_idx": np.empty(flush_size, dtype=np.int64),
+                "person_id": np.empty(flush_size, dtype=np.uint32),
+                "positions": np.empty(
+                    (flush_size, n_joints, 3), dtype=np.float32),
+                "confidences": np.empty(
+                    (flush_size, n_joints), dtype=np.uint8),
+                "idx": 0}
+            for i in sources for j in range(n_bodies)
+            }
+        ts_buffers = {
+            i: {
+                "frame_idx": np.empty(flush_size, dtype=np.int64),
+                "ts": np.empty(flush_size, dtype=np.uint64),
+                "system_ts": np.empty(flush_size, dtype=np.uint64),
+                "interpolated": np.empty(flush_size, dtype=np.uint8),
+                "idx": 0}
+            for i in sources}
+
+        return joint_buffers, ts_buffers
 
     joint_names = np.array(
         K4ABT_JOINT_NAMES, dtype=h5py.string_dtype(encoding="utf-8"))
@@ -140,50 +665,71 @@ def body_saver_thread(
     h5file.create_dataset(
         "joint_connections", data=K4ABT_SEGMENT_PAIRS, dtype="u1")
 
-    joint_data = {}
     joints_grp = h5file.create_group("joints")
-    for i in range(n_devices):
-        device_grp = joints_grp.create_group(f"device_{i}")
-        device_grp.attrs["device_id"] = i
+    ts_grp = h5file.create_group("ts")
+    if fused:
+        fused_grp = h5file.create_group("fused")
+        fused_grp.attrs["n_devices"] = n_devices
+
+    joint_data = {}
+    for i in sources:
+        if i == FUSED_DEVICE_ID:
+            device_grp = fused_grp
+        else:
+            device_grp = joints_grp.create_group(f"device_{i}")
+            device_grp.attrs["device_id"] = i
         for j in range(n_bodies):
             body_grp = device_grp.create_group(f"body_{j}")
             body_grp.attrs["body_idx"] = j
             body_grp.create_dataset(
-                "frame_idx", shape=(0,), maxshape=(None,), dtype="i8",
-                chunks=(flush_size,))
+                "frame_idx", **dataset_options(
+                    storage_profile, (), "i8", flush_size))
+            body_grp.create_dataset(
+                "person_id", **dataset_options(
+                    storage_profile, (), "u4", flush_size))
             body_grp.create_dataset(
-                "positions", shape=(0, n_joints, 3), maxshape=(None, n_joints, 3),
-                dtype="f4", chunks=(flush_size, n_joints, 3))
+                "positions", **dataset_options(
+                    storage_profile, (n_joints, 3), "f4", flush_size))
             body_grp.create_dataset(
-                "confidences", shape=(0, n_joints), maxshape=(None, n_joints),
-                dtype="u1", chunks=(flush_size, n_joints))
+                "confidences", **dataset_options(
+                    storage_profile, (n_joints,), "u1", flush_size))
 
             joint_data[(i, j)] = {
                 "frame_idx": body_grp["frame_idx"],
+                "person_id": body_grp["person_id"],
                 "positions": body_grp["positions"],
                 "confidences": body_grp["confidences"]}
 
     ts_data = {}
-    ts_grp = h5file.create_group("ts")
-    for i in range(n_devices):
-        device_grp = ts_grp.create_group(f"device_{i}")
-        device_grp.attrs["device_id"] = i
+    for i in sources:
+        if i == FUSED_DEVICE_ID:
+            device_grp = fused_grp
+        else:
+            device_grp = ts_grp.create_group(f"device_{i}")
+            device_grp.attrs["device_id"] = i
         device_grp.create_dataset(
-            "ts", shape=(0,), maxshape=(None,), dtype="u8",
-            chunks=(flush_size,))
+            "frame_idx", **dataset_options(
+                storage_profile, (), "i8", flush_size))
         device_grp.create_dataset(
-            "system_ts", shape=(0,), maxshape=(None,), dtype="u8",
-            chunks=(flush_size,))
+            "ts", **dataset_options(storage_profile, (), "u8", flush_size))
+        device_grp.create_dataset(
+            "system_ts", **dataset_options(
+                storage_profile, (), "u8", flush_size))
+        # Frames whose joints were interpolated between tracked frames.
+        device_grp.create_dataset(
+            "interpolated", **dataset_options(
+                storage_profile, (), "u1", flush_size))
 
         ts_data[i] = {
-            "ts": device_grp["ts"], "system_ts": device_grp["system_ts"]}
+            "frame_idx": device_grp["frame_idx"], "ts": device_grp["ts"],
+            "system_ts": device_grp["system_ts"],
+            "interpolated": device_grp["interpolated"]}
 
-    def flush_joint_buffer(device_id: int, body_idx: int):
-        data = joint_data[(device_id, body_idx)]
-        buffer = joint_buffers[(device_id, body_idx)]
+    def flush_joint_buffer(data: dict, buffer: dict) -> int:
         idx = buffer["idx"]
 
         d_frame_idx = data["frame_idx"]
+        d_person_id = data["person_id"]
         d_positions = data["positions"]
         d_confidences = data["confidences"]
 
@@ -191,131 +737,345 @@ def body_saver_thread(
         new_n = old_n + idx
 
         d_frame_idx.resize(new_n, axis=0)
+        d_person_id.resize(new_n, axis=0)
         d_positions.resize(new_n, axis=0)
         d_confidences.resize(new_n, axis=0)
 
         d_frame_idx[old_n:new_n] = buffer["frame_idx"][:idx]
+        d_person_id[old_n:new_n] = buffer["person_id"][:idx]
         d_positions[old_n:new_n, :, :] = buffer["positions"][:idx]
         d_confidences[old_n:new_n, :] = buffer["confidences"][:idx]
 
         buffer["idx"] = 0
 
-    def flush_ts_buffer(device_id: int):
-        data = ts_data[device_id]
-        buffer = ts_buffers[device_id]
+        return idx * sum(
+            buffer[name][0].nbytes
+            for name in ("frame_idx", "person_id", "positions", "confidences"))
+
+    def flush_ts_buffer(data: dict, buffer: dict) -> int:
         idx = buffer["idx"]
 
+        d_frame_idx = data["frame_idx"]
         d_ts = data["ts"]
         d_system_ts = data["system_ts"]
+        d_interpolated = data["interpolated"]
         old_n = d_ts.shape[0]
         new_n = old_n + idx
+        d_frame_idx.resize(new_n, axis=0)
         d_ts.resize(new_n, axis=0)
         d_system_ts.resize(new_n, axis=0)
+        d_interpolated.resize(new_n, axis=0)
+        d_frame_idx[old_n:new_n] = buffer["frame_idx"][:idx]
         d_ts[old_n:new_n] = buffer["ts"][:idx]
         d_system_ts[old_n:new_n] = buffer["system_ts"][:idx]
+        d_interpolated[old_n:new_n] = buffer["interpolated"][:idx]
 
         buffer["idx"] = 0
 
+        return idx * sum(
+            buffer[name][0].nbytes
+            for name in ("frame_idx", "ts", "system_ts", "interpolated"))
+
+    # The ingest loop fills one buffer set while the flush worker writes the
+    # other one, so disk stalls never block the joints queue.
+    free_sets = queue.Queue()
+    full_sets = queue.Queue()
+    if flush_monitor is None:
+        flush_monitor = FlushMonitor()
+    flush_latency = REGISTRY.histogram("fbt_stage_seconds", "flush")
+
+    def flush_buffer_set(buffer_set: tuple[dict, dict]):
+        joint_buffers, ts_buffers = buffer_set
+
+        start_time = time.perf_counter()
+        n_bytes = 0
+        flushed = dict()
+        if TRACER.enabled:
+            flushed = {
+                key: buffer["frame_idx"][:buffer["idx"]].copy()
+                for key, buffer in ts_buffers.items()
+                if key != FUSED_DEVICE_ID}
+        for key, buffer in ts_buffers.items():
+            if buffer["idx"] > 0:
+                n_bytes += flush_ts_buffer(ts_data[key], buffer)
+        for key, buffer in joint_buffers.items():
+            if buffer["idx"] > 0:
+                n_bytes += flush_joint_buffer(joint_data[key], buffer)
+        h5file.flush()
+        elapsed_time = time.perf_counter() - start_time
+        flush_monitor.update(elapsed_time, n_bytes)
+        flush_latency.observe(elapsed_time)
+        for key, frame_idxs in flushed.items():
+            TRACER.mark_many("flushed", key, frame_idxs)
+
+    def flush_worker():
+        while True:
+            buffer_set = full_sets.get()
+            if buffer_set is None:
+                break
+            try:
+                flush_buffer_set(buffer_set)
+            except Exception as e:
+                # The ingest loop waits on the free sets, it gets the error
+                # instead of a set and raises it.
+                free_sets.put(e)
+                break
+            free_sets.put(buffer_set)
+
+    def take_free_set() -> tuple[dict, dict]:
+        buffer_set = free_sets.get()
+        if isinstance(buffer_set, Exception):
+            flush_t.join()
+            h5file.close()
+            raise buffer_set
+
+        return buffer_set
+
+    free_sets.put(new_buffer_set())
+    joint_buffers, ts_buffers = new_buffer_set()
+    flush_t = threading.Thread(target=flush_worker)
+    flush_t.start()
+
+    # Each body_j slot follows one person id. A new id takes a free slot,
+    # or the one whose person was seen least recently.
+    slot_ids = {i: np.full(n_bodies, -1, dtype=np.int64) for i in sources}
+    slot_seen = {i: np.full(n_bodies, -1, dtype=np.int64) for i in sources}
+
+    def body_slots(
+            device_id: int, frame_idx: int,
+            ids: npt.NDArray[np.uint32]) -> list[tuple[int, int]]:
+        ids = ids.astype(np.int64)
+        slots = slot_ids[device_id]
+        seen = slot_seen[device_id]
+        assigned = []
+        for body_idx, person_id in enumerate(ids):
+            matches = np.flatnonzero(slots == person_id)
+            if len(matches):
+                slot = matches[0]
+            else:
+                candidates = np.flatnonzero(~np.isin(slots, ids))
+                if not len(candidates):
+                    continue
+                slot = candidates[np.argmin(seen[candidates])]
+                slots[slot] = person_id
+            seen[slot] = frame_idx
+            assigned.append((body_idx, int(slot)))
+
+        return assigned
+
     finished_workers = 0
-    flush = False
     while finished_workers < n_devices:
         item = joints_queue.get()
         if item is None:
             finished_workers += 1
             continue
 
-        frame_idx, ts, system_ts, device_id, bodies = item
+        frame_idx, ts, system_ts, device_id, ids, positions, confidences = (
+            item[:7])
         buffer = ts_buffers[device_id]
         idx = buffer["idx"]
 
+        buffer["frame_idx"][idx] = frame_idx
         buffer["ts"][idx] = ts
         buffer["system_ts"][idx] = system_ts
+        buffer["interpolated"][idx] = _is_interpolated(item)
         buffer["idx"] += 1
-        if buffer["idx"] >= flush_size:
-            flush_ts_buffer(device_id)
-            flush = True
+        full = buffer["idx"] >= flush_size
 
-        for body_idx, body in enumerate(bodies):
-            if body_idx >= n_bodies:
-                break
-            buffer = joint_buffers[(device_id, body_idx)]
+        for body_idx, slot in body_slots(device_id, frame_idx, ids):
+            buffer = joint_buffers[(device_id, slot)]
             idx = buffer["idx"]
 
             buffer["frame_idx"][idx] = frame_idx
-            buffer["positions"][idx, :, :] = body.positions
-            buffer["confidences"][idx, :] = body.confidences
+            buffer["person_id"][idx] = ids[body_idx]
+            buffer["positions"][idx, :, :] = positions[body_idx]
+            buffer["confidences"][idx, :] = confidences[body_idx]
             buffer["idx"] += 1
-            if (buffer["idx"] >= flush_size) or flush:
-                flush_joint_buffer(device_id, body_idx)
-                flush = True
-
-        if flush:
-            h5file.flush()
-            flush = False
-
-    flush = False
-    for device_id in range(n_devices):
-        if ts_buffers[device_id]["idx"] > 0:
-            flush_ts_buffer(device_id)
-            flush = True
-        for body_idx in range(n_bodies):
-            if joint_buffers[(device_id, body_idx)]["idx"] > 0:
-                flush_joint_buffer(device_id, body_idx)
-                flush = True
-    if flush:
-        h5file.flush()
-    h5file.close()
-
+            full = full or buffer["idx"] >= flush_size
 
-def video_saver_thread(
-        video_queue: queue.Queue, video_dir: pathlib.Path, n_devices: int,
-        fps: int = 30, width: int = 1920, height: int = 1080):
-    containers = {}
-    streams = {}
-    for i in range(n_devices):
-        filename = video_dir / f"device_{i}.mkv"
-        container = av.open(str(filename), mode="w")
+        if full:
+            full_sets.put((joint_buffers, ts_buffers))
+            try:
+                joint_buffers, ts_buffers = take_free_set()
+            except Exception:
+                # Nothing more can be saved. The session is stopped and the
+                # joints are drained, so that no worker blocks on the queue.
+                if stop_event is not None:
+                    stop_event.set()
+                while finished_workers < n_devices:
+                    if joints_queue.get() is None:
+                        finished_workers += 1
+                raise
+
+    full_sets.put((joint_buffers, ts_buffers))
+    full_sets.put(None)
+    flush_t.join()
+    # An error of the last flushes is still waiting in the free sets.
+    while not free_sets.empty():
+        take_free_set()
+    flush_monitor.report()
+    h5file.close()
 
-        stream = container.add_stream("av1_nvenc", rate=fps)
-        stream.width = width
-        stream.height = height
-        stream.pix_fmt = "yuv420p"
 
-        stream.options = {
-            "preset": "p4", "tune": "ll", "rc": "vbr", "cq": "28", "gpu": "0"}
-        containers[i] = container
-        streams[i] = stream
+def journal_saver_thread(
+        joints_queue: queue.Queue, file_dir: pathlib.Path,
+        n_devices: int = 1, n_bodies: int = 1):
+    # Appends are plain copies into memory maps, nothing to flush while
+    # the session runs.
+    journal = JointJournal(file_dir / "journal", max_bodies=n_bodies)
 
     finished_workers = 0
     while finished_workers < n_devices:
-        item = video_queue.get()
+        item = joints_queue.get()
         if item is None:
             finished_workers += 1
             continue
+        journal.append(item)
+    journal.close()
+
+
+def journal_to_h5(
+        journal_dir: pathlib.Path | str, file_dir: pathlib.Path | str,
+        n_devices: int | None = None, storage_profile: str = "none",
+        recover: bool = True):
+    if recover:
+        recover_journal(journal_dir)
+    info = journal_info(journal_dir)
+    fused = FUSED_DEVICE_ID in info["device_ids"]
+    if n_devices is None:
+        n_devices = max(info["device_ids"], default=0) + 1
+
+    joints_queue = queue.Queue(maxsize=100)
+    body_saver_t = _CheckedThread(
+        target=body_saver_thread,
+        args=(
+            joints_queue, pathlib.Path(file_dir), n_devices,
+            max(info["max_bodies"], 1), 30*60, fused, None, storage_profile))
+    body_saver_t.start()
+    for item in read_journal(journal_dir):
+        joints_queue.put(item)
+    for _ in range(n_devices):
+        joints_queue.put(None)
+    body_saver_t.join()
+    body_saver_t.raise_error()
+
+
+def video_encoder_thread(
+        device_queue: queue.Queue, filename: pathlib.Path, codec_profile: str,
+        fps: int = 30, width: int = 1920, height: int = 1080,
+        frame_pool: FramePool | None = None, pix_fmt: str | None = None,
+        max_age_ms: float | None = None):
+    container = av.open(str(filename), mode="w")
+    passthrough = codec_profile == MJPEG_PASSTHROUGH
+    if passthrough:
+        stream = add_passthrough_stream(container, fps, width, height)
+    else:
+        stream = add_video_stream(
+            container, codec_profile, fps, width, height, pix_fmt=pix_fmt)
 
-        image, device_id = item
-        frame = av.VideoFrame.from_ndarray(image, format="bgr24")
+    first_ts = None
+    last_pts = -1
+    latency = None
+    while True:
+        item = device_queue.get()
+        if item is None:
+            break
 
-        stream = streams[device_id]
-        container = containers[device_id]
+        image, device_id, frame_idx, system_ts = item
+        if latency is None:
+            latency = REGISTRY.histogram(
+                "fbt_stage_seconds", "encode", device_id)
+            shed = REGISTRY.counter(
+                "fbt_shed_frames_total", "encoder", device_id)
+        if _is_stale(system_ts, max_age_ms):
+            shed.inc()
+            if frame_pool is not None:
+                frame_pool.release(image)
+            continue
+        start_time = time.perf_counter()
+        if passthrough:
+            # JPEG and device timestamp, muxed without decoding.
+            jpeg, ts = image
+            if first_ts is None:
+                first_ts = ts
+            pts = ts - first_ts
+            if pts > last_pts:
+                container.mux(mjpeg_packet(stream, jpeg, pts))
+                last_pts = pts
+            latency.observe(time.perf_counter() - start_time)
+            TRACER.mark("encoded", device_id, frame_idx)
+            continue
+        elif isinstance(image, av.VideoFrame):
+            frame = image
+        elif frame_pool is not None:
+            # The frame is copied, so the slot can go back to the pool.
+            frame = av.VideoFrame.from_ndarray(
+                frame_pool[image], format="bgr24")
+            frame_pool.release(image)
+        else:
+            frame = av.VideoFrame.from_ndarray(image, format="bgr24")
 
         for packet in stream.encode(frame):
             container.mux(packet)
+        latency.observe(time.perf_counter() - start_time)
+        # With frame threading, the packets of the frame can come later.
+        TRACER.mark("encoded", device_id, frame_idx)
+
+    if not passthrough:
+        for packet in stream.encode():
+            container.mux(packet)
+    container.close()
+
 
+def video_saver_thread(
+        video_queue: queue.Queue, video_dir: pathlib.Path, n_devices: int,
+        fps: int = 30, width: int = 1920, height: int = 1080,
+        frame_pool: FramePool | None = None, codec_profile: str = "auto",
+        pix_fmt: str | None = None, max_age_ms: float | None = None):
+    codec_profile = select_codec_profile(codec_profile)
+
+    # One encoder per device, so the devices are encoded in parallel.
+    device_queues = dict()
+    encoder_t = dict()
+    dfa = dict()
     for i in range(n_devices):
-        for packet in streams[i].encode():
-            containers[i].mux(packet)
-        containers[i].close()
+        device_queues[i] = queue.Queue(maxsize=10)
+        REGISTRY.watch_queue("encoder", device_queues[i], i)
+        dfa[i] = DroppedFramesAlert("encoder", i)
+        encoder_t[i] = threading.Thread(
+            target=video_encoder_thread,
+            args=(
+                device_queues[i], video_dir / f"device_{i}.mkv",
+                codec_profile, fps, width, height, frame_pool, pix_fmt,
+                max_age_ms))
+        encoder_t[i].start()
+
+    finished_workers = 0
+    while finished_workers < n_devices:
+        item = video_queue.get()
+        if item is None:
+            finished_workers += 1
+            continue
+        if _put_drop_oldest(device_queues[item[1]], item, frame_pool):
+            dfa[item[1]].update()
+
+    for i in range(n_devices):
+        device_queues[i].put(None)
+    for t in encoder_t.values():
+        t.join()
 
 
 def visualization_main_tread(
         visualization_queue: queue.Queue, stop_event: threading.Event,
-        n_devices: int, width: int = 1920, height: int = 1080):
+        n_devices: int, width: int = 1920, height: int = 1080,
+        frame_pool: FramePool | None = None, max_age_ms: float | None = None):
     window_bar_height = 20
     taskbar_height = 30
     from_border = 5
     aspect_ratio = width / height
 
+    # Only imported here, headless sessions never load a GUI toolkit.
+    import tkinter as tk
     root = tk.Tk()
     screen_w = root.winfo_screenwidth()
     screen_h = root.winfo_screenheight()
@@ -335,31 +1095,112 @@ def visualization_main_tread(
         item = visualization_queue.get()
         if item is None:
             break
-        bgr_image, device_id = item
+        bgr_image, device_id, system_ts = item
+        if _is_stale(system_ts, max_age_ms):
+            if frame_pool is not None:
+                frame_pool.release(bgr_image)
+            continue
 
-        cv2.imshow(f"Color images with skeleton {device_id}", bgr_image)
+        if frame_pool is not None:
+            cv2.imshow(
+                f"Color images with skeleton {device_id}",
+                frame_pool[bgr_image])
+            frame_pool.release(bgr_image)
+        else:
+            cv2.imshow(f"Color images with skeleton {device_id}", bgr_image)
         if cv2.waitKey(1) == ord("q"):
             stop_event.set()
     cv2.destroyAllWindows()
 
 
+def mosaic_visualization_main_thread(
+        visualization_queue: queue.Queue, stop_event: threading.Event,
+        n_devices: int, width: int = 1920, height: int = 1080,
+        frame_pool: FramePool | None = None, mosaic_width: int = 1280,
+        refresh_hz: float = 15.0, max_age_ms: float | None = None):
+    preview = MosaicPreview(n_devices, width, height, mosaic_width)
+    period = 1.0 / refresh_hz
+    # Newest frame of each device since the last refresh, the older ones
+    # are dropped without being drawn.
+    latest = dict()
+
+    def release(image):
+        if frame_pool is not None:
+            frame_pool.release(image)
+
+    finished_workers = 0
+    next_refresh = time.perf_counter()
+    while finished_workers < n_devices:
+        timeout = max(next_refresh - time.perf_counter(), 0.0)
+        try:
+            item = visualization_queue.get(timeout=timeout)
+            if item is None:
+                finished_workers += 1
+            else:
+                image, device_id, system_ts = item
+                if device_id in latest:
+                    release(latest[device_id][0])
+                latest[device_id] = (image, system_ts)
+        except queue.Empty:
+            pass
+
+        now = time.perf_counter()
+        if now < next_refresh:
+            continue
+        next_refresh = max(next_refresh + period, now)
+        for device_id, (image, system_ts) in latest.items():
+            # A tile keeps its last image rather than showing a stale one.
+            if not _is_stale(system_ts, max_age_ms):
+                preview.update(
+                    device_id,
+                    image if frame_pool is None else frame_pool[image])
+            release(image)
+        latest.clear()
+        if preview.show() == ord("q"):
+            stop_event.set()
+
+    for image, _ in latest.values():
+        release(image)
+    preview.close()
+
+
+def _wait_for_stop(stop_event: threading.Event):
+    # SIGINT and SIGTERM stop the session, handlers can only be installed
+    # from the main thread.
+    handlers = dict()
+    if threading.current_thread() is threading.main_thread():
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            handlers[signum] = signal.signal(
+                signum, lambda *args: stop_event.set())
+    try:
+        while not stop_event.wait(timeout=0.5):
+            pass
+    finally:
+        for signum, handler in handlers.items():
+            signal.signal(signum, handler)
+
+
 def _default_device_initialization(
-        device_index: int = 0,
-        device_mode: str = "standalone") -> tuple[Device, Tracker]:
+        device_index: int = 0, device_mode: str = "standalone",
+        tracker_depth: int = 1,
+        color_format: int = K4A_IMAGE_FORMAT_COLOR_BGRA32,
+        color_resolution: int = K4A_COLOR_RESOLUTION_1080P) -> tuple[
+            Device, Tracker]:
     modes = {
         "standalone": K4A_WIRED_SYNC_MODE_STANDALONE,
         "main": K4A_WIRED_SYNC_MODE_MASTER,
         "secondary": K4A_WIRED_SYNC_MODE_SUBORDINATE}
 
     device_config = Configuration()
-    device_config.color_format = K4A_IMAGE_FORMAT_COLOR_BGRA32
-    device_config.color_resolution = K4A_COLOR_RESOLUTION_1080P
+    device_config.color_format = color_format
+    device_config.color_resolution = color_resolution
     device_config.depth_mode = K4A_DEPTH_MODE_WFOV_2X2BINNED
     device_config.synchronized_images_only = True
     device_config.wired_sync_mode = modes[device_mode]
 
     device = start_device(device_index=device_index, config=device_config)
-    tracker = start_body_tracker(calibration=device.calibration)
+    tracker = start_body_tracker(
+        calibration=device.calibration, max_in_flight=tracker_depth)
 
     return device, tracker
 
@@ -367,23 +1208,92 @@ def _default_device_initialization(
 def default_pipeline(
         base_dir: pathlib.Path | str,
         trans_matrices: dict[int, npt.NDArray[np.float32]] | None = None,
-        sync: bool = False, n_bodies: int = 1):
+        sync: bool = False, n_bodies: int = 1, tracker_depth: int = 1,
+        width: int = 1920, height: int = 1080,
+        frameset_queue: queue.Queue | None = None, associate: bool = False,
+        fuse: bool = False, storage_profile: str = "none",
+        journal: bool = False, codec_profile: str = "auto",
+        preview_scale: int = 1, ingest: str = "bgra",
+        mosaic_width: int | None = 1280, preview_hz: float = 15.0,
+        headless: bool = False, stop_event: threading.Event | None = None,
+        metrics_interval_s: float | None = 5.0, trace: bool = False,
+        max_age_ms: dict[str, float] | None = None,
+        max_tracking_stride: int = 1):
     if trans_matrices is None:
         n_devices = 1
     else:
         n_devices = len(trans_matrices) + 1
+    check_storage_profile(storage_profile)
+    # Framesets are matched on device timestamps, which only share a clock
+    # between hardware-synced devices.
+    if n_devices > 1 and not sync and (
+            frameset_queue is not None or associate or fuse):
+        raise ValueError(
+            "Framesets, association and fusion across devices need "
+            "hardware-synced devices, use sync=True.")
+    codec_profile = select_codec_profile(codec_profile)
+    # An empty dict disables the shedding by age.
+    if max_age_ms is None:
+        max_age_ms = DEFAULT_MAX_AGE_MS
+    if ingest not in INGEST_FORMATS:
+        raise ValueError(
+            f"Unknown ingest '{ingest}', available ingests: "
+            f"{', '.join(INGEST_FORMATS)}.")
+    color_resolution = _color_resolution(width, height)
+    # The devices stream MJPEG, which is recorded without re-encoding.
+    passthrough = codec_profile == MJPEG_PASSTHROUGH
+    color_format = INGEST_FORMATS[ingest]
+    if passthrough:
+        if ingest != "bgra":
+            raise ValueError("MJPEG passthrough has its own ingest.")
+        color_format = K4A_IMAGE_FORMAT_COLOR_MJPG
+    # The devices only stream NV12 and YUY2 at 720p.
+    yuv = color_format in YUV_FORMATS
+    if yuv and height != 720:
+        raise ValueError(f"The {ingest} ingest needs 1280x720 images.")
 
     devices = dict()
     trackers = dict()
 
     capture_queues = dict()
     capture_t = dict()
-    stop_event = threading.Event()
+    # The session is stopped by setting the event, from another thread or
+    # by a signal when headless.
+    if stop_event is None:
+        stop_event = threading.Event()
 
     computation_t = dict()
     joints_queue = queue.Queue(maxsize=10)
     video_queue = queue.Queue(maxsize=10)
-    visualization_queue = queue.Queue(maxsize=10)
+    # Headless, nothing is decoded or drawn for display.
+    visualization_queue = None if headless else queue.Queue(maxsize=10)
+    # The metrics of a session start from zero.
+    REGISTRY.clear()
+    REGISTRY.watch_queue("joints", joints_queue)
+    REGISTRY.watch_queue("video", video_queue)
+    if visualization_queue is not None:
+        REGISTRY.watch_queue("visualization", visualization_queue)
+    # With passthrough and YUV ingest, the pool only holds the preview
+    # frames, possibly at a reduced scale.
+    video_in_pool = not (passthrough or yuv)
+    decoder = None
+    frame_shape = (height, width, 3)
+    if passthrough and not headless:
+        decoder = MjpegDecoder(n_workers=n_devices, scale=preview_scale)
+        frame_shape = decoder.output_shape(width, height)
+    elif yuv:
+        frame_shape = (height // preview_scale, width // preview_scale, 3)
+    # Enough slots for every full queue, every consumer and every producer,
+    # so that acquiring a slot never waits for long. Video frames also wait
+    # in the encoder queue of their device.
+    n_slots = n_devices
+    if video_in_pool:
+        n_slots += video_queue.maxsize + n_devices * (10 + 1)
+    if visualization_queue is not None:
+        n_slots += visualization_queue.maxsize + n_devices + 1
+    frame_pool = None
+    if video_in_pool or visualization_queue is not None:
+        frame_pool = FramePool(n_slots, frame_shape)
 
     initialize_libraries(track_body=True)
     for i in range(n_devices - 1, -1, -1):  # Start the secondary first.
@@ -395,14 +1305,26 @@ def default_pipeline(
         else:
             device_mode = "standalone"
         device, tracker = _default_device_initialization(
-            device_index=i, device_mode=device_mode)
+            device_index=i, device_mode=device_mode,
+            tracker_depth=tracker_depth, color_format=color_format,
+            color_resolution=color_resolution)
         devices[i] = device
         trackers[i] = tracker
 
         capture_queues[i] = queue.Queue(maxsize=10)
+        # Opt-in: when the tracker falls behind, only every stride-th
+        # capture is tracked and the joints of the others are interpolated.
+        decimator = None
+        if max_tracking_stride > 1:
+            decimator = TrackingDecimator(
+                CAMERA_FPS[device.configuration.camera_fps],
+                max_tracking_stride)
         capture_t[i] = threading.Thread(
             target=capture_thread,
-            args=(device, tracker, capture_queues[i], stop_event))
+            args=(
+                device, tracker, capture_queues[i], stop_event, i,
+                decimator))
+        REGISTRY.watch_queue("capture", capture_queues[i], i)
 
         if i == 0:
             rot_matrix = None
@@ -414,31 +1336,287 @@ def default_pipeline(
             target=computation_thread,
             args=(
                 i, device.calibration, capture_queues[i], joints_queue,
-                video_queue, visualization_queue, rot_matrix, trans_vector))
+                video_queue, visualization_queue, rot_matrix, trans_vector,
+                frame_pool, 10, color_format, decoder, preview_scale,
+                max_age_ms))
 
     base_dir = pathlib.Path(base_dir)
     timestamp = datetime.now().strftime("%Y_%m_%d_%H_%M")
     file_dir = base_dir / timestamp
     file_dir.mkdir(parents=True, exist_ok=True)
-    body_saver_t = threading.Thread(
-        target=body_saver_thread,
-        args=(joints_queue, file_dir, n_devices, n_bodies))
+    # With a frameset consumer, association or fusion, the results are
+    # grouped across devices before being saved. Fusion needs global ids.
+    fuse = fuse and n_devices > 1
+    associate = associate or fuse
+    saver_queue = joints_queue
+    synchronizer_t = None
+    if frameset_queue is not None or associate:
+        saver_queue = queue.Queue(maxsize=10)
+        synchronizer = FrameSynchronizer(
+            n_devices,
+            delays_usec=[
+                devices[i].configuration.subordinate_delay_off_master_usec
+                for i in range(n_devices)])
+        synchronizer_t = threading.Thread(
+            target=synchronizer_thread,
+            args=(
+                joints_queue, saver_queue, frameset_queue, synchronizer,
+                IdentityAssociator() if associate else None, fuse))
+    # The journal is converted to body.h5 once the session is over.
+    if journal:
+        body_saver_t = _CheckedThread(
+            target=journal_saver_thread,
+            args=(saver_queue, file_dir, n_devices, n_bodies))
+    else:
+        body_saver_t = _CheckedThread(
+            target=body_saver_thread,
+            args=(
+                saver_queue, file_dir, n_devices, n_bodies, 30*60, fuse,
+                None, storage_profile, stop_event))
+    # The video frames are only pool slots in BGRA ingest.
     video_saver_t = threading.Thread(
-        target=video_saver_thread, args=(video_queue, file_dir, n_devices))
+        target=video_saver_thread,
+        args=(
+            video_queue, file_dir, n_devices, 30, width, height,
+            frame_pool if video_in_pool else None, codec_profile,
+            "nv12" if ingest == "nv12" else None, max_age_ms.get("video")))
+    if saver_queue is not joints_queue:
+        REGISTRY.watch_queue("saver", saver_queue)
+    exporter = None
+    if metrics_interval_s is not None:
+        exporter = MetricsExporter(
+            REGISTRY, file_dir / "metrics.jsonl", file_dir / "metrics.prom",
+            metrics_interval_s)
+        exporter.start()
+    if trace:
+        TRACER.start()
 
     video_saver_t.start()
     body_saver_t.start()
+    if synchronizer_t is not None:
+        synchronizer_t.start()
     for t in computation_t.values():
         t.start()
     for t in capture_t.values():
         t.start()
-    visualization_main_tread(visualization_queue, stop_event, n_devices)
+    # Without a mosaic width, every device gets its own window.
+    if headless:
+        _wait_for_stop(stop_event)
+    elif mosaic_width is None:
+        visualization_main_tread(
+            visualization_queue, stop_event, n_devices, width, height,
+            frame_pool, max_age_ms.get("visualization"))
+    else:
+        mosaic_visualization_main_thread(
+            visualization_queue, stop_event, n_devices, width, height,
+            frame_pool, mosaic_width, preview_hz,
+            max_age_ms.get("visualization"))
 
     video_saver_t.join()
     body_saver_t.join()
+    if synchronizer_t is not None:
+        synchronizer_t.join()
     for t in capture_t.values():
         t.join()
     for t in computation_t.values():
         t.join()
+    if decoder is not None:
+        decoder.close()
+    if exporter is not None:
+        exporter.stop()
+    if trace:
+        TRACER.stop()
+        print(TRACER.write(file_dir), end="")
     del trackers
     del devices
+    body_saver_t.raise_error()
+
+    if journal:
+        journal_to_h5(
+            file_dir / "journal", file_dir, n_devices, storage_profile)
+
+
+def device_process(
+        device_index: int, device_mode: str, tracker_depth: int,
+        frame_ring: SharedFrameRing, stop_event: mp.Event,
+        ready_event: mp.Event,
+        ext_rot: npt.NDArray[np.float64] | None = None,
+        ext_trans: npt.NDArray[np.float64] | None = None,
+        color_resolution: int = K4A_COLOR_RESOLUTION_1080P,
+        metrics_dir: pathlib.Path | None = None,
+        metrics_interval_s: float = 5.0):
+    initialize_libraries(track_body=True)
+    device, tracker = _default_device_initialization(
+        device_index=device_index, device_mode=device_mode,
+        tracker_depth=tracker_depth, color_resolution=color_resolution)
+    ready_event.set()
+
+    capture_queue = queue.Queue(maxsize=10)
+    # The registry of this process is exported to its own files, next to
+    # the ones of the main process.
+    REGISTRY.watch_queue("capture", capture_queue, device_index)
+    exporter = None
+    if metrics_dir is not None:
+        exporter = MetricsExporter(
+            REGISTRY, metrics_dir / f"metrics_device_{device_index}.jsonl",
+            metrics_dir / f"metrics_device_{device_index}.prom",
+            metrics_interval_s)
+        exporter.start()
+    capture_t = threading.Thread(
+        target=capture_thread,
+        args=(device, tracker, capture_queue, stop_event, device_index))
+    capture_t.start()
+    ring_computation_thread(
+        device.calibration, capture_queue, frame_ring, ext_rot, ext_trans,
+        10, device_index)
+    capture_t.join()
+    if exporter is not None:
+        exporter.stop()
+
+    frame_ring.close()
+    del tracker
+    del device
+
+
+def multiprocess_pipeline(
+        base_dir: pathlib.Path | str,
+        trans_matrices: dict[int, npt.NDArray[np.float32]] | None = None,
+        sync: bool = False, n_bodies: int = 1, tracker_depth: int = 1,
+        n_slots: int = 8, width: int = 1920, height: int = 1080,
+        codec_profile: str = "auto", mosaic_width: int | None = 1280,
+        preview_hz: float = 15.0, metrics_interval_s: float | None = 5.0):
+    if trans_matrices is None:
+        n_devices = 1
+    else:
+        n_devices = len(trans_matrices) + 1
+
+    color_resolution = _color_resolution(width, height)
+    codec_profile = select_codec_profile(codec_profile)
+    if codec_profile == MJPEG_PASSTHROUGH:
+        raise ValueError(
+            "MJPEG passthrough is not supported by the multiprocess "
+            "pipeline, the frame rings hold decoded frames.")
+    ctx = mp.get_context("spawn")
+    stop_event = ctx.Event()
+
+    frame_rings = dict()
+    device_p = dict()
+    ready_events = dict()
+    collector_t = dict()
+    joints_queue = queue.Queue(maxsize=10)
+    video_queue = queue.Queue(maxsize=10)
+    visualization_queue = queue.Queue(maxsize=10)
+    # Only the stages of this process are in its registry, the device
+    # processes export theirs to metrics_device_<i> files.
+    REGISTRY.clear()
+    REGISTRY.watch_queue("joints", joints_queue)
+    REGISTRY.watch_queue("video", video_queue)
+    REGISTRY.watch_queue("visualization", visualization_queue)
+    base_dir = pathlib.Path(base_dir)
+    timestamp = datetime.now().strftime("%Y_%m_%d_%H_%M")
+    file_dir = base_dir / timestamp
+    file_dir.mkdir(parents=True, exist_ok=True)
+    metrics_dir = None if metrics_interval_s is None else file_dir
+
+    for i in range(n_devices - 1, -1, -1):  # Start the secondary first.
+        if sync and n_devices != 1:
+            if i == 0:
+                device_mode = "main"
+            else:
+                device_mode = "secondary"
+        else:
+            device_mode = "standalone"
+
+        if i == 0:
+            rot_matrix = None
+            trans_vector = None
+        else:
+            rot_matrix = trans_matrices[i][:3, :3]
+            trans_vector = trans_matrices[i][:3, 3]
+
+        frame_rings[i] = SharedFrameRing(
+            n_slots, height, width, n_bodies, ctx=ctx)
+        ready_events[i] = ctx.Event()
+        device_p[i] = ctx.Process(
+            target=device_process,
+            args=(
+                i, device_mode, tracker_depth, frame_rings[i], stop_event,
+                ready_events[i], rot_matrix, trans_vector, color_resolution,
+                metrics_dir, metrics_interval_s))
+        collector_t[i] = threading.Thread(
+            target=ring_collector_thread,
+            args=(
+                i, frame_rings[i], joints_queue, video_queue,
+                visualization_queue, device_p[i], stop_event))
+
+    body_saver_t = _CheckedThread(
+        target=body_saver_thread,
+        args=(
+            joints_queue, file_dir, n_devices, n_bodies, 30*60, False, None,
+            "none", stop_event))
+    video_saver_t = threading.Thread(
+        target=video_saver_thread,
+        args=(
+            video_queue, file_dir, n_devices, 30, width, height, None,
+            codec_profile))
+    exporter = None
+    if metrics_interval_s is not None:
+        exporter = MetricsExporter(
+            REGISTRY, file_dir / "metrics.jsonl", file_dir / "metrics.prom",
+            metrics_interval_s)
+        exporter.start()
+
+    video_saver_t.start()
+    body_saver_t.start()
+    for t in collector_t.values():
+        t.start()
+    # Devices must be started in order, wait for each one to be running.
+    # A device process dying before it is ready stops the session.
+    failed = None
+    for i, p in device_p.items():
+        p.start()
+        while not ready_events[i].wait(timeout=1.0):
+            if not p.is_alive():
+                failed = i
+                break
+        if failed is not None:
+            break
+    if failed is not None:
+        # Nothing is published on the rings of the failed and the unstarted
+        # devices, so their collectors are closed from here.
+        stop_event.set()
+        for i, p in device_p.items():
+            if i == failed or p.pid is None:
+                frame_rings[i].close_writer()
+        finished_collectors = 0
+        while finished_collectors < n_devices:
+            if visualization_queue.get() is None:
+                finished_collectors += 1
+    elif mosaic_width is None:
+        visualization_main_tread(
+            visualization_queue, stop_event, n_devices, width, height)
+    else:
+        mosaic_visualization_main_thread(
+            visualization_queue, stop_event, n_devices, width, height, None,
+            mosaic_width, preview_hz)
+
+    video_saver_t.join()
+    body_saver_t.join()
+    for t in collector_t.values():
+        t.join()
+    for p in device_p.values():
+        if p.pid is not None:
+            p.join()
+    for frame_ring in frame_rings.values():
+        frame_ring.close()
+    if exporter is not None:
+        exporter.stop()
+    if failed is not None:
+        raise RuntimeError(
+            f"Device {failed} process exited with code "
+            f"{device_p[failed].exitcode} before being ready.")
+    for i, p in device_p.items():
+        if p.exitcode:
+            raise RuntimeError(
+                f"Device {i} process exited with code {p.exitcode}.")
+    body_saver_t.raise_error()
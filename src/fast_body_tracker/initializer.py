@@ -41,8 +41,9 @@ def start_device(
 
 
 def start_body_tracker(
-        calibration, tracker_configuration=TrackerConfiguration()):
-    return Tracker(calibration, tracker_configuration)
+        calibration, tracker_configuration=TrackerConfiguration(),
+        max_in_flight=1):
+    return Tracker(calibration, tracker_configuration, max_in_flight)
 
 
 def start_playback(filepath):
@@ -1,4 +1,4 @@
-from .calibration import Calibration
+from .calibration import Calibration, Projector
 from .capture import Capture
 from .configuration import Configuration
 from .device import Device
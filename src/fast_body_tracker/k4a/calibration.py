@@ -13,10 +13,20 @@ from . import k4a_const
 class Calibration:
     def __init__(self, calibration_handle: k4a_calibration_t):
         self._handle = calibration_handle
+        self._projectors = {}
 
     def handle(self) -> k4a_calibration_t:
         return self._handle
 
+    def get_projector(
+            self, source_camera: int, target_camera: int) -> "Projector":
+        key = (source_camera, target_camera)
+        if key not in self._projectors:
+            self._projectors[key] = Projector(
+                self, source_camera, target_camera)
+
+        return self._projectors[key]
+
     def get_k_matrix(self, camera: int) -> npt.NDArray[np.float32]:
         color_params = (
             self._handle.color_camera_calibration.intrinsics.parameters.param)
@@ -147,3 +157,89 @@ class Calibration:
             raise _k4a.AzureKinectSensorException(failure_message)
 
         return target_point2d
+
+
+class Projector:
+    """
+    Vectorized equivalent of k4a_calibration_3d_to_2d.
+
+    It follows the SDK projection of the rational 6KT and Brown-Conrady lens
+    models in float32, for any number of points at once.
+    """
+    def __init__(
+            self, calibration: Calibration, source_camera: int,
+            target_camera: int):
+        if source_camera == target_camera:
+            rotation_matrix = np.eye(3)
+            translation_vector_mm = np.zeros(3)
+        else:
+            rotation_matrix, translation_vector_mm = (
+                calibration.get_extrinsics(source_camera, target_camera))
+        self.rotation_matrix_t = np.ascontiguousarray(
+            rotation_matrix.T, dtype=np.float32)
+        self.translation_vector_mm = translation_vector_mm.astype(np.float32)
+
+        if target_camera == k4a_const.K4A_CALIBRATION_TYPE_COLOR:
+            camera = calibration.handle().color_camera_calibration
+        else:
+            camera = calibration.handle().depth_camera_calibration
+        self.lens_model = camera.intrinsics.type
+        if self.lens_model not in (
+                k4a_const.K4A_CALIBRATION_LENS_DISTORTION_MODEL_RATIONAL_6KT,
+                k4a_const.K4A_CALIBRATION_LENS_DISTORTION_MODEL_BROWN_CONRADY):
+            raise _k4a.AzureKinectSensorException(
+                "Unsupported lens distortion model.")
+        params = camera.intrinsics.parameters.param
+        self._params = {
+            name: np.float32(getattr(params, name)) for name in (
+                "cx", "cy", "fx", "fy", "k1", "k2", "k3", "k4", "k5", "k6",
+                "codx", "cody", "p1", "p2")}
+        self._max_rs = np.float32(camera.metric_radius) ** 2
+
+    def project(self, points3d: npt.NDArray[np.float32]) -> Tuple[
+            npt.NDArray[np.float32], npt.NDArray[np.bool_]]:
+        p = self._params
+        points3d = np.asarray(points3d, dtype=np.float32)
+        points3d = points3d @ self.rotation_matrix_t
+        points3d += self.translation_vector_mm
+
+        z = points3d[..., 2]
+        valid = z > 0
+        z = np.where(valid, z, np.float32(1.0))
+        xp = points3d[..., 0] / z - p["codx"]
+        yp = points3d[..., 1] / z - p["cody"]
+
+        xp2 = xp * xp
+        yp2 = yp * yp
+        xyp = xp * yp
+        rs = xp2 + yp2
+        if self._max_rs > 0:
+            valid &= rs <= self._max_rs
+        rss = rs * rs
+        rsc = rss * rs
+        a = 1 + p["k1"] * rs + p["k2"] * rss + p["k3"] * rsc
+        b = 1 + p["k4"] * rs + p["k5"] * rss + p["k6"] * rsc
+        bi = np.divide(
+            np.float32(1.0), b, out=np.ones_like(b), where=b != 0)
+        d = a * bi
+
+        xp_d = xp * d
+        yp_d = yp * d
+        rs_2xp2 = rs + 2 * xp2
+        rs_2yp2 = rs + 2 * yp2
+        if (self.lens_model
+                == k4a_const.K4A_CALIBRATION_LENS_DISTORTION_MODEL_RATIONAL_6KT):
+            xp_d += rs_2xp2 * p["p2"] + xyp * p["p1"]
+            yp_d += rs_2yp2 * p["p1"] + xyp * p["p2"]
+        else:
+            # Brown-Conrady doubles the tangential xyp term.
+            xp_d += rs_2xp2 * p["p2"] + 2 * xyp * p["p1"]
+            yp_d += rs_2yp2 * p["p1"] + 2 * xyp * p["p2"]
+
+        points2d = np.empty(points3d.shape[:-1] + (2,), dtype=np.float32)
+        points2d[..., 0] = (xp_d + p["codx"]) * p["fx"] + p["cx"]
+        points2d[..., 1] = (yp_d + p["cody"]) * p["fy"] + p["cy"]
+        # The SDK leaves invalid points at zero.
+        points2d[~valid] = 0
+
+        return points2d, valid
@@ -1,3 +1,4 @@
+import ctypes
 import numpy as np
 from numpy import typing as npt
 import cv2
@@ -11,6 +12,16 @@ class WrongImageFormat(Exception):
     pass
 
 
+class _ImageBuffer:
+    # Exposes the native buffer to NumPy and keeps the owning Image alive
+    # for as long as any array built on top of it.
+    def __init__(self, image: "Image", address: int, size: int):
+        self.image = image
+        self.__array_interface__ = {
+            "data": (address, False), "shape": (size,), "typestr": "|u1",
+            "version": 3}
+
+
 class Image:
     def __init__(self, image_handle: k4a_image_t):
         self._handle = image_handle
@@ -50,9 +61,21 @@ class Image:
     def system_timestamp(self) -> int:
         return _k4a.K4aLib.k4a_image_get_system_timestamp_nsec(self._handle)
 
-    def to_numpy(self) -> npt.NDArray[np.uint8 | np.uint16 | np.int16]:
-        buffer = np.ctypeslib.as_array(
-            _k4a.K4aLib.k4a_image_get_buffer(self._handle), shape=(self.size,))
+    def to_bytes(self) -> bytes:
+        # Copy of the raw buffer, e.g. the JPEG of an MJPG color image.
+        return ctypes.string_at(
+            _k4a.K4aLib.k4a_image_get_buffer(self._handle), self.size)
+
+    def to_numpy(
+            self, copy: bool = False, raw: bool = False) -> npt.NDArray[
+                np.uint8 | np.uint16 | np.int16]:
+        # Without copy, uncompressed formats are views over the native
+        # buffer, which is released only once every view is gone. With raw,
+        # NV12 and YUY2 are returned without the BGR conversion.
+        address = ctypes.cast(
+            _k4a.K4aLib.k4a_image_get_buffer(self._handle),
+            ctypes.c_void_p).value
+        buffer = np.asarray(_ImageBuffer(self, address, self.size))
 
         # COLOR MJPG, decode with OpenCV.
         if self.format == k4a_const.K4A_IMAGE_FORMAT_COLOR_MJPG:
@@ -61,11 +84,15 @@ class Image:
         # NV12, YUV conversion.
         elif self.format == k4a_const.K4A_IMAGE_FORMAT_COLOR_NV12:
             yuv = buffer.reshape(int(self.height * 1.5), self.width)
+            if raw:
+                return _copy_if(yuv, copy)
             return cv2.cvtColor(yuv, cv2.COLOR_YUV2BGR_NV12)
 
         # YUY2, YUV conversion.
         elif self.format == k4a_const.K4A_IMAGE_FORMAT_COLOR_YUY2:
             yuv = buffer.reshape(self.height, self.width, 2)
+            if raw:
+                return _copy_if(yuv, copy)
             return cv2.cvtColor(yuv, cv2.COLOR_YUV2BGR_YUY2)
 
         # BGRA32.
@@ -77,8 +104,7 @@ class Image:
             arr2d = arr2d[:, :width * 4]
             view3d = np.lib.stride_tricks.as_strided(
                 arr2d, shape=(height, width, 4), strides=(stride, 4, 1))
-            # Ensure contiguity for OpenCV plotting.
-            return np.ascontiguousarray(view3d)
+            return _copy_if(view3d, copy)
 
         # DEPTH16, IR16, CUSTOM16.
         elif self.format in (
@@ -89,19 +115,26 @@ class Image:
             stride_elements = self.stride // 2
             arr16 = arr16.reshape((self.height, stride_elements))
             arr16 = arr16[:, :self.width]
-            return np.ascontiguousarray(arr16)
+            return _copy_if(arr16, copy)
 
         # CUSTOM8.
         elif self.format == k4a_const.K4A_IMAGE_FORMAT_CUSTOM8:
             stride_elements = self.stride
             arr8 = buffer.reshape((self.height, stride_elements))
             arr8 = arr8[:, :self.width]
-            return np.ascontiguousarray(arr8)
+            return _copy_if(arr8, copy)
 
         # CUSTOM.
         elif self.format == k4a_const.K4A_IMAGE_FORMAT_CUSTOM:
             arr = buffer.view("<i2").reshape((-1, 3))
-            return arr
+            return _copy_if(arr, copy)
 
         else:
             raise WrongImageFormat(f"Unsupported format {self.format}.")
+
+
+def _copy_if(array: npt.NDArray, copy: bool) -> npt.NDArray:
+    if copy:
+        return array.copy(order="C")
+
+    return array
@@ -1,6 +1,7 @@
-from .body import Body, draw_body
+from .body import Body, JOINT_DTYPE, draw_body
 from .frame import (
-    Frame, colorize_segmentation_image, transform_segmentation_image)
+    Frame, colorize_segmentation_image, empty_bodies_array,
+    transform_segmentation_image)
 from .tracker import Tracker
 from .tracker_configuration import TrackerConfiguration
 from .kabt_const import *
@@ -1,12 +1,11 @@
-import ctypes
+import functools
 import numpy as np
 from numpy import typing as npt
 import cv2
-import matplotlib.pyplot as plt
 
 from ..k4a import k4a_const
 from ..k4a import Calibration
-from ._k4abt_types import k4abt_body_t, k4a_float3
+from ._k4abt_types import k4abt_body_t
 from . import kabt_const
 
 JOINT_DTYPE = np.dtype([
@@ -14,7 +13,21 @@ JOINT_DTYPE = np.dtype([
     ("confidence", np.int32)
     ])
 
-_cmap = plt.get_cmap("tab20")
+
+@functools.cache
+def body_colors() -> npt.NDArray[np.uint8]:
+    # BGR colors of the tab20 colormap, one row per body id. Imported here
+    # and without pyplot, so that no GUI backend is loaded.
+    from matplotlib import colormaps
+
+    cmap = colormaps["tab20"]
+    colors = np.zeros((256, 3), dtype=np.uint8)
+    for i in range(256):
+        rgba = cmap(i % 20)
+        colors[i] = [
+            int(rgba[2] * 255), int(rgba[1] * 255), int(rgba[0] * 255)]
+
+    return colors
 
 
 class Body:
@@ -43,19 +56,17 @@ class Body:
             self, calibration: Calibration,
             target_camera: int = k4a_const.K4A_CALIBRATION_TYPE_DEPTH) -> (
                 npt.NDArray[np.float32]):
-        positions_2d = [
-            calibration.convert_3d_to_2d(
-                position.ctypes.data_as(ctypes.POINTER(k4a_float3)).contents,
-                k4a_const.K4A_CALIBRATION_TYPE_DEPTH, target_camera)
-            for position in self.positions]
-        return np.array(positions_2d, dtype=np.float32)
+        projector = calibration.get_projector(
+            k4a_const.K4A_CALIBRATION_TYPE_DEPTH, target_camera)
+        positions_2d, _ = projector.project(self.positions)
+
+        return positions_2d
 
 
 def draw_body(
         image: npt.NDArray[np.uint8], positions_2d: npt.NDArray[np.float32],
         body_id: int, only_segments: bool = False) -> npt.NDArray[np.uint8]:
-    rgba = _cmap(body_id % 20)
-    color = (int(rgba[2] * 255), int(rgba[1] * 255), int(rgba[0] * 255))
+    color = tuple(int(c) for c in body_colors()[body_id % 20])
 
     positions = [tuple(position) for position in positions_2d.astype(np.int32)]
 
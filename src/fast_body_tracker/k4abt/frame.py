@@ -2,20 +2,14 @@ import ctypes
 import numpy as np
 from numpy import typing as npt
 import cv2
-import matplotlib.pyplot as plt
 
 from ..k4a import Image, Transformation
-from ._k4abt_types import k4abt_body_t, k4abt_frame_t
+from ._k4abt_types import k4abt_body_t, k4abt_frame_t, k4abt_skeleton_t
 from . import _k4abt
 from . import kabt_const
-from .body import Body
+from .body import Body, JOINT_DTYPE, body_colors
 
-cmap = plt.get_cmap("tab20")
-body_colors = np.zeros((256, 3), dtype=np.uint8)
-for i in range(256):
-    rgba = cmap(i % 20)
-    body_colors[i] = [int(rgba[2] * 255), int(rgba[1] * 255),
-                      int(rgba[0] * 255)]
+_skeleton_p = ctypes.POINTER(k4abt_skeleton_t)
 
 
 class Frame:
@@ -24,10 +18,10 @@ class Frame:
 
     def __del__(self):
         if self._handle:
-            _k4abt.k4abt_frame_release(self._handle)
+            _k4abt.K4abtLib.k4abt_frame_release(self._handle)
 
     def get_num_bodies(self) -> int:
-        return _k4abt.k4abt_frame_get_num_bodies(self._handle)
+        return _k4abt.K4abtLib.k4abt_frame_get_num_bodies(self._handle)
 
     def get_bodies(self) -> list[Body]:
         num_bodies = self.get_num_bodies()
@@ -41,9 +35,10 @@ class Frame:
     def get_body(self, body_idx: int = 0) -> Body:
         body_handle = k4abt_body_t()
 
-        body_handle.id = _k4abt.k4abt_frame_get_body_id(self._handle, body_idx)
+        body_handle.id = _k4abt.K4abtLib.k4abt_frame_get_body_id(
+            self._handle, body_idx)
 
-        result_code = _k4abt.k4abt_frame_get_body_skeleton(
+        result_code = _k4abt.K4abtLib.k4abt_frame_get_body_skeleton(
             self._handle, body_idx, ctypes.byref(body_handle.skeleton))
         if result_code != kabt_const.K4ABT_RESULT_SUCCEEDED:
             raise _k4abt.AzureKinectBodyTrackerException(
@@ -51,12 +46,47 @@ class Frame:
 
         return Body(body_handle)
 
+    def get_bodies_array(
+            self, ids: npt.NDArray[np.uint32],
+            joints: npt.NDArray[np.void]) -> int:
+        # The skeletons are written straight into the rows of joints, which
+        # share the k4abt_skeleton_t memory layout. Bodies beyond the
+        # capacity of the arrays are skipped.
+        if joints.dtype != JOINT_DTYPE or not joints.flags.c_contiguous:
+            raise ValueError(
+                "joints must be a C-contiguous JOINT_DTYPE array.")
+        num_bodies = min(self.get_num_bodies(), len(ids), len(joints))
+        address = joints.ctypes.data
+        row_size = joints.strides[0]
+        for body_idx in range(num_bodies):
+            ids[body_idx] = _k4abt.K4abtLib.k4abt_frame_get_body_id(
+                self._handle, body_idx)
+            result_code = _k4abt.K4abtLib.k4abt_frame_get_body_skeleton(
+                self._handle, body_idx,
+                ctypes.cast(address + body_idx*row_size, _skeleton_p))
+            if result_code != kabt_const.K4ABT_RESULT_SUCCEEDED:
+                raise _k4abt.AzureKinectBodyTrackerException(
+                    "Body tracker get body skeleton failed.")
+
+        return num_bodies
+
     def get_segmentation_image_object(self) -> Image:
-        return Image(_k4abt.k4abt_frame_get_body_index_map(self._handle))
+        return Image(
+            _k4abt.K4abtLib.k4abt_frame_get_body_index_map(self._handle))
 
     @property
     def timestamp(self) -> int:
-        return _k4abt.k4abt_frame_get_device_timestamp_usec(self._handle)
+        return _k4abt.K4abtLib.k4abt_frame_get_device_timestamp_usec(
+            self._handle)
+
+
+def empty_bodies_array(max_bodies: int) -> tuple[
+        npt.NDArray[np.uint32], npt.NDArray[np.void]]:
+    ids = np.zeros(max_bodies, dtype=np.uint32)
+    joints = np.zeros(
+        (max_bodies, kabt_const.K4ABT_JOINT_COUNT), dtype=JOINT_DTYPE)
+
+    return ids, joints
 
 
 def colorize_segmentation_image(
@@ -64,7 +94,7 @@ def colorize_segmentation_image(
     seg_image = seg_image_object.to_numpy()
 
     return np.dstack(
-        [cv2.LUT(seg_image, body_colors[:, j]) for j in range(3)])
+        [cv2.LUT(seg_image, body_colors()[:, j]) for j in range(3)])
 
 
 def transform_segmentation_image(
@@ -75,4 +105,4 @@ def transform_segmentation_image(
     trans_seg_image = trans_seg_image.to_numpy()
 
     return np.dstack(
-        [cv2.LUT(trans_seg_image, body_colors[:, j]) for j in range(3)])
+        [cv2.LUT(trans_seg_image, body_colors()[:, j]) for j in range(3)])
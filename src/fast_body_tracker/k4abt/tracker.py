@@ -1,4 +1,5 @@
 import ctypes
+from collections import deque
 
 from ..k4a import k4a_const
 from ..k4a import Capture, Calibration, Transformation
@@ -12,41 +13,71 @@ from .frame import Frame
 class Tracker:
     def __init__(
             self, calibration: Calibration,
-            tracker_configuration: TrackerConfiguration):
+            tracker_configuration: TrackerConfiguration,
+            max_in_flight: int = 1):
         self.tracker_configuration = tracker_configuration
         self.calibration = calibration
         self.transformation = Transformation(self.calibration)
+        # Captures enqueued in the SDK and still waiting for their body
+        # frame. The SDK returns results in enqueue order, so a FIFO is
+        # enough to pair every popped frame with its capture.
+        self.max_in_flight = max_in_flight
+        self._in_flight = deque()
         self._handle = self._create_handle()
 
     def __del__(self):
         if self._handle:
-            _k4abt.k4abt_tracker_destroy(self._handle)
+            _k4abt.K4abtLib.k4abt_tracker_destroy(self._handle)
+
+    @property
+    def n_in_flight(self) -> int:
+        return len(self._in_flight)
+
+    def is_full(self) -> bool:
+        return len(self._in_flight) >= self.max_in_flight
 
     def update(
             self, capture: Capture,
             timeout_in_ms: int = k4a_const.K4A_WAIT_INFINITE) -> Frame:
-        result_code = _k4abt.k4abt_tracker_enqueue_capture(
+        # Synchronous mode, do not mix with enqueue/pop calls.
+        self.enqueue(capture, timeout_in_ms)
+        _, frame = self.pop(timeout_in_ms)
+
+        return frame
+
+    def enqueue(
+            self, capture: Capture,
+            timeout_in_ms: int = k4a_const.K4A_WAIT_INFINITE):
+        result_code = _k4abt.K4abtLib.k4abt_tracker_enqueue_capture(
             self._handle, capture.handle(), timeout_in_ms)
         if result_code != kabt_const.K4ABT_RESULT_SUCCEEDED:
             raise _k4abt.AzureKinectBodyTrackerException(
                 "Body tracker capture enqueue failed.")
+        self._in_flight.append(capture)
+
+    def pop(
+            self, timeout_in_ms: int = k4a_const.K4A_WAIT_INFINITE) -> tuple[
+                Capture, Frame]:
+        if not self._in_flight:
+            raise _k4abt.AzureKinectBodyTrackerException(
+                "Body tracker has no capture in flight.")
 
         frame_handle = k4abt_frame_t()
-        result_code = _k4abt.k4abt_tracker_pop_result(
+        result_code = _k4abt.K4abtLib.k4abt_tracker_pop_result(
             self._handle, ctypes.byref(frame_handle), timeout_in_ms)
         if result_code != kabt_const.K4ABT_RESULT_SUCCEEDED:
             raise _k4abt.AzureKinectBodyTrackerException(
                 "Body tracker get body frame failed.")
 
-        return Frame(frame_handle=frame_handle)
+        return self._in_flight.popleft(), Frame(frame_handle=frame_handle)
 
     def set_temporal_smoothing(self, smoothing_factor: float):
-        _k4abt.k4abt_tracker_set_temporal_smoothing(
+        _k4abt.K4abtLib.k4abt_tracker_set_temporal_smoothing(
             self._handle, smoothing_factor)
 
     def _create_handle(self) -> k4abt_tracker_t:
         tracker_handle = k4abt_tracker_t()
-        result_code = _k4abt.k4abt_tracker_create(
+        result_code = _k4abt.K4abtLib.k4abt_tracker_create(
             ctypes.byref(self.calibration.handle()),
             self.tracker_configuration.handle(), ctypes.byref(tracker_handle))
         if result_code != kabt_const.K4ABT_RESULT_SUCCEEDED:
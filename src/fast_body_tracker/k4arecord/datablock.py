@@ -17,20 +17,23 @@ class Datablock:
 
     def reset(self):
         if self.is_valid():
-            _k4arecord.k4a_playback_data_block_release(self._handle)
+            _k4arecord.K4aRecordLib.k4a_playback_data_block_release(
+                self._handle)
             self._handle = None
 
     def get_device_timestamp_usec(self):
         return int(
-            _k4arecord.k4a_playback_data_block_get_device_timestamp_usec(
-                self._handle))
+            _k4arecord.K4aRecordLib
+            .k4a_playback_data_block_get_device_timestamp_usec(self._handle))
 
     def get_buffer_size(self):
         return int(
-            _k4arecord.k4a_playback_data_block_get_buffer_size(self._handle))
+            _k4arecord.K4aRecordLib.k4a_playback_data_block_get_buffer_size(
+                self._handle))
 
     def get_buffer(self):
         if not self.is_valid():
             return None
 
-        return _k4arecord.k4a_playback_data_block_get_buffer(self._handle)
+        return _k4arecord.K4aRecordLib.k4a_playback_data_block_get_buffer(
+            self._handle)
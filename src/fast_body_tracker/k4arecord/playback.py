@@ -25,8 +25,8 @@ class Playback:
     def open(self, filepath):
 
         _k4arecord.VERIFY(
-            _k4arecord.k4a_playback_open(filepath.encode('utf-8'),
-                                         self._handle),
+            _k4arecord.K4aRecordLib.k4a_playback_open(
+                filepath.encode('utf-8'), self._handle),
             "Failed to open recording!")
 
     def update(self):
@@ -43,15 +43,15 @@ class Playback:
 
     def close(self):
         if self.is_valid():
-            _k4arecord.k4a_playback_close(self._handle)
+            _k4arecord.K4aRecordLib.k4a_playback_close(self._handle)
             self._handle = None
 
     def get_calibration(self):
         calibration_handle = _k4arecord.k4a_calibration_t()
         if self.is_valid():
             _k4arecord.VERIFY(
-                _k4arecord.k4a_playback_get_calibration(self._handle,
-                                                        calibration_handle),
+                _k4arecord.K4aRecordLib.k4a_playback_get_calibration(
+                    self._handle, calibration_handle),
                 "Failed to read device calibration from recording!")
 
         return Calibration(calibration_handle)
@@ -61,8 +61,8 @@ class Playback:
 
         if self.is_valid():
             _k4arecord.VERIFY(
-                _k4arecord.k4a_playback_get_record_configuration(self._handle,
-                                                                 config),
+                _k4arecord.K4aRecordLib.k4a_playback_get_record_configuration(
+                    self._handle, config),
                 "Failed to read record configuration!")
 
         return RecordConfiguration(config)
@@ -76,8 +76,8 @@ class Playback:
         else:
             self._capture = Capture(capture_handle, self.calibration)
 
-        ret = _k4arecord.k4a_playback_get_next_capture(self._handle,
-                                                       capture_handle) != _k4arecord.K4A_STREAM_RESULT_EOF
+        ret = _k4arecord.K4aRecordLib.k4a_playback_get_next_capture(
+            self._handle, capture_handle) != _k4arecord.K4A_STREAM_RESULT_EOF
 
         return ret, self._capture
 
@@ -90,16 +90,17 @@ class Playback:
         else:
             self._capture = Capture(capture_handle, self.calibration)
 
-        ret = _k4arecord.k4a_playback_get_previous_capture(self._handle,
-                                                           capture_handle) != _k4arecord.K4A_STREAM_RESULT_EOF
+        ret = _k4arecord.K4aRecordLib.k4a_playback_get_previous_capture(
+            self._handle, capture_handle) != _k4arecord.K4A_STREAM_RESULT_EOF
 
         return ret, self._capture
 
     def get_next_imu_sample(self):
         imu_sample_struct = _k4a.k4a_imu_sample_t()
-        _k4a.verify(_k4arecord.k4a_playback_get_next_imu_sample(self._handle,
-                                                                imu_sample_struct),
-                    "Get next imu sample failed!")
+        _k4a.verify(
+            _k4arecord.K4aRecordLib.k4a_playback_get_next_imu_sample(
+                self._handle, imu_sample_struct),
+            "Get next imu sample failed!")
 
         # Convert the structure into a dictionary
         _imu_sample = ImuSample(imu_sample_struct)
@@ -109,8 +110,8 @@ class Playback:
     def get_previous_imu_sample(self):
         imu_sample_struct = _k4a.k4a_imu_sample_t()
         _k4a.verify(
-            _k4arecord.k4a_playback_get_previous_imu_sample(self._handle,
-                                                            imu_sample_struct),
+            _k4arecord.K4aRecordLib.k4a_playback_get_previous_imu_sample(
+                self._handle, imu_sample_struct),
             "Get previous imu sample failed!")
 
         # Convert the structure into a dictionary
@@ -121,24 +122,26 @@ class Playback:
     def seek_timestamp(self, offset=0,
                        origin=_k4arecord.K4A_PLAYBACK_SEEK_BEGIN):
         _k4a.verify(
-            _k4arecord.k4a_playback_seek_timestamp(self._handle, offset,
-                                                   origin),
+            _k4arecord.K4aRecordLib.k4a_playback_seek_timestamp(
+                self._handle, offset, origin),
             "Seek recording failed!")
 
     def get_recording_length(self):
         return int(
-            _k4arecord.k4a_playback_get_recording_length_usec(self._handle))
+            _k4arecord.K4aRecordLib.k4a_playback_get_recording_length_usec(
+                self._handle))
 
     def set_color_conversion(self, format=k4a_const.K4A_IMAGE_FORMAT_DEPTH16):
         _k4a.verify(
-            _k4arecord.k4a_playback_set_color_conversion(self._handle, format),
+            _k4arecord.K4aRecordLib.k4a_playback_set_color_conversion(
+                self._handle, format),
             "Seek color conversio failed!")
 
     def get_next_data_block(self, track):
         block_handle = _k4arecord.k4a_playback_data_block_t()
         _k4a.verify(
-            _k4arecord.k4a_playback_get_next_data_block(self._handle, track,
-                                                        block_handle),
+            _k4arecord.K4aRecordLib.k4a_playback_get_next_data_block(
+                self._handle, track, block_handle),
             "Get next data block failed!")
 
         if self.is_datablock_initialized():
@@ -151,9 +154,8 @@ class Playback:
     def get_previous_data_block(self, track):
         block_handle = _k4arecord.k4a_playback_data_block_t()
         _k4a.verify(
-            _k4arecord.k4a_playback_get_previous_data_block(self._handle,
-                                                            track,
-                                                            block_handle),
+            _k4arecord.K4aRecordLib.k4a_playback_get_previous_data_block(
+                self._handle, track, block_handle),
             "Get previous data block failed!")
 
         if self.is_datablock_initialized():
@@ -14,9 +14,9 @@ class Record:
 
     def create_recording(self, device_handle, device_configuration, filepath):
         _k4arecord.VERIFY(
-            _k4arecord.k4a_record_create(filepath.encode('utf-8'),
-                                         device_handle, device_configuration,
-                                         self.record_handle),
+            _k4arecord.K4aRecordLib.k4a_record_create(
+                filepath.encode('utf-8'), device_handle, device_configuration,
+                self.record_handle),
             "Failed to create recording!")
 
     def is_valid(self):
@@ -24,18 +24,20 @@ class Record:
 
     def close(self):
         if self.is_valid():
-            _k4arecord.k4a_record_close(self.record_handle)
+            _k4arecord.K4aRecordLib.k4a_record_close(self.record_handle)
             self.record_handle = None
 
     def flush(self):
         if self.is_valid():
-            _k4arecord.VERIFY(_k4arecord.k4a_record_flush(self.record_handle),
-                              "Failed to flush!")
+            _k4arecord.VERIFY(
+                _k4arecord.K4aRecordLib.k4a_record_flush(self.record_handle),
+                "Failed to flush!")
 
     def write_header(self):
         if self.is_valid():
             _k4arecord.VERIFY(
-                _k4arecord.k4a_record_write_header(self.record_handle),
+                _k4arecord.K4aRecordLib.k4a_record_write_header(
+                    self.record_handle),
                 "Failed to write header!")
 
     def write_capture(self, capture_handle):
@@ -47,6 +49,6 @@ class Record:
             self.write_header()
             self.header_written = True
         _k4arecord.VERIFY(
-            _k4arecord.k4a_record_write_capture(self.record_handle,
-                                                capture_handle),
+            _k4arecord.K4aRecordLib.k4a_record_write_capture(
+                self.record_handle, capture_handle),
             "Failed to write capture!")
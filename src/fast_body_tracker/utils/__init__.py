@@ -1,3 +1,24 @@
-from .performace_calculator import DroppedFramesAlert, FrameRateCalculator
+from .performace_calculator import (
+    DroppedFramesAlert, FlushMonitor, FrameRateCalculator)
 from .visualizer import IMUVisualizer, PointCloudVisualizer
 from .keyboard_closer import KeyboardCloser
+from .frame_pool import FramePool
+from .shared_frame_ring import SharedFrameRing
+from .frame_synchronizer import FrameSynchronizer
+from .skeleton_fusion import fuse_skeletons
+from .identity_association import IdentityAssociator
+from .storage_profiles import (
+    STORAGE_PROFILES, check_storage_profile, dataset_options)
+from .joint_journal import (
+    JointJournal, journal_info, read_journal, recover_journal)
+from .body_dataset import BodyDataset
+from .session_alignment import align_session
+from .codec_profiles import (
+    CODEC_PROFILES, MJPEG_PASSTHROUGH, available_codec_profiles,
+    select_codec_profile)
+from .mjpeg_decoder import MjpegDecoder
+from .yuv_frames import yuv_preview, yuv_video_frame
+from .mosaic_preview import MosaicPreview
+from .metrics import REGISTRY, MetricsExporter, MetricsRegistry
+from .frame_tracer import TRACE_STAGES, TRACER, FrameTracer
+from .tracking_decimator import TrackingDecimator
@@ -0,0 +1,159 @@
+from collections import OrderedDict
+import pathlib
+import numpy as np
+from numpy import typing as npt
+import h5py
+
+
+class BodyDataset:
+    """
+    Lazy reader of body.h5 answering time range queries.
+
+    Only the ts samples visited by a binary search and the chunks covering
+    the answer are read from disk. Chunks are kept in an LRU cache, so
+    nearby queries are served from memory.
+    """
+    def __init__(self, file_path: pathlib.Path | str, cache_size: int = 256):
+        self.file_path = pathlib.Path(file_path)
+        self.cache_size = cache_size
+        self.n_reads = 0
+
+        self._h5file = None
+        self._cache = OrderedDict()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def h5file(self) -> h5py.File:
+        if self._h5file is None:
+            self._h5file = h5py.File(self.file_path, "r")
+        return self._h5file
+
+    @property
+    def devices(self) -> list[int | str]:
+        devices = [
+            self.h5file["ts"][name].attrs["device_id"]
+            for name in self.h5file["ts"]]
+        devices = sorted(int(device) for device in devices)
+        if "fused" in self.h5file:
+            devices.append("fused")
+        return devices
+
+    def bodies(self, device: int | str) -> list[int]:
+        return sorted(
+            int(name.split("_")[1]) for name in self._joints_group(device)
+            if name.startswith("body_"))
+
+    def close(self):
+        self._cache.clear()
+        if self._h5file is not None:
+            self._h5file.close()
+            self._h5file = None
+
+    def query(
+            self, device: int | str, body: int, t_start: int, t_end: int
+            ) -> dict[str, npt.NDArray]:
+        # Device timestamps in usec, t_start included and t_end excluded.
+        ts_grp = self._ts_group(device)
+        start = self._search(ts_grp["ts"], t_start)
+        end = self._search(ts_grp["ts"], t_end)
+        ts = self._read(ts_grp["ts"], start, end)
+        system_ts = self._read(ts_grp["system_ts"], start, end)
+        if "frame_idx" in ts_grp:
+            frame_idx = self._read(ts_grp["frame_idx"], start, end)
+        else:
+            frame_idx = np.arange(start, end, dtype=np.int64)
+
+        body_grp = self._joints_group(device)[f"body_{body}"]
+        if len(frame_idx):
+            row_start = self._search(body_grp["frame_idx"], frame_idx[0])
+            row_end = self._search(body_grp["frame_idx"], frame_idx[-1] + 1)
+        else:
+            row_start = row_end = 0
+        body_frame_idx = self._read(body_grp["frame_idx"], row_start, row_end)
+
+        # Join on frame_idx, a body row is kept when its frame has a ts.
+        ts_rows = np.searchsorted(frame_idx, body_frame_idx)
+        ts_rows = np.minimum(ts_rows, max(len(frame_idx) - 1, 0))
+        valid = (
+            (frame_idx[ts_rows] == body_frame_idx) if len(frame_idx)
+            else np.zeros(len(body_frame_idx), dtype=np.bool_))
+        rows = np.flatnonzero(valid)
+        ts_rows = ts_rows[rows]
+
+        result = {
+            "frame_idx": body_frame_idx[rows], "ts": ts[ts_rows],
+            "system_ts": system_ts[ts_rows]}
+        if "interpolated" in ts_grp:
+            result["interpolated"] = self._read(
+                ts_grp["interpolated"], start, end)[ts_rows].astype(np.bool_)
+        for name in (
+                "person_id", "positions", "orientations", "confidences"):
+            if name in body_grp:
+                result[name] = self._read(
+                    body_grp[name], row_start, row_end)[rows]
+
+        return result
+
+    def _ts_group(self, device: int | str) -> h5py.Group:
+        if device == "fused":
+            return self.h5file["fused"]
+        return self.h5file[f"ts/device_{device}"]
+
+    def _joints_group(self, device: int | str) -> h5py.Group:
+        if device == "fused":
+            return self.h5file["fused"]
+        return self.h5file[f"joints/device_{device}"]
+
+    def _chunk(self, dataset: h5py.Dataset, chunk_idx: int) -> npt.NDArray:
+        key = (dataset.name, chunk_idx)
+        chunk = self._cache.get(key)
+        if chunk is not None:
+            self._cache.move_to_end(key)
+            return chunk
+
+        rows = self._chunk_rows(dataset)
+        chunk = dataset[chunk_idx * rows:(chunk_idx + 1) * rows]
+        self.n_reads += 1
+        self._cache[key] = chunk
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+        return chunk
+
+    @staticmethod
+    def _chunk_rows(dataset: h5py.Dataset) -> int:
+        if dataset.chunks is None:
+            return max(dataset.shape[0], 1)
+        return dataset.chunks[0]
+
+    def _read(self, dataset: h5py.Dataset, start: int, end: int) -> (
+            npt.NDArray):
+        if end <= start:
+            return np.empty((0, *dataset.shape[1:]), dtype=dataset.dtype)
+        rows = self._chunk_rows(dataset)
+        first = start // rows
+        last = (end - 1) // rows
+        chunks = [self._chunk(dataset, i) for i in range(first, last + 1)]
+        data = chunks[0] if len(chunks) == 1 else np.concatenate(chunks)
+
+        return data[start - first * rows:end - first * rows]
+
+    def _search(self, dataset: h5py.Dataset, value: int) -> int:
+        # First row with a value not lower than value, like
+        # np.searchsorted, reading one chunk per step at most.
+        rows = self._chunk_rows(dataset)
+        low = 0
+        high = dataset.shape[0]
+        while low < high:
+            mid = (low + high) // 2
+            if self._chunk(dataset, mid // rows)[mid % rows] < value:
+                low = mid + 1
+            else:
+                high = mid
+
+        return low
@@ -0,0 +1,134 @@
+import functools
+from fractions import Fraction
+import av
+
+CODEC_PROFILES = {
+    "av1_nvenc": {
+        "codec": "av1_nvenc", "pix_fmt": "yuv420p",
+        "options": {
+            "preset": "p4", "tune": "ll", "rc": "vbr", "cq": "28",
+            "gpu": "0"}},
+    "h264_nvenc": {
+        "codec": "h264_nvenc", "pix_fmt": "yuv420p",
+        "options": {
+            "preset": "p4", "tune": "ll", "rc": "vbr", "cq": "23",
+            "gpu": "0"}},
+    "libx264_ultrafast": {
+        "codec": "libx264", "pix_fmt": "yuv420p",
+        "options": {
+            "preset": "ultrafast", "tune": "zerolatency", "crf": "23"}},
+    "libx264_veryfast": {
+        "codec": "libx264", "pix_fmt": "yuv420p",
+        "options": {"preset": "veryfast", "crf": "23"}},
+    "libsvtav1_fast": {
+        "codec": "libsvtav1", "pix_fmt": "yuv420p",
+        "options": {"preset": "12", "crf": "35"}},
+    "libsvtav1_balanced": {
+        "codec": "libsvtav1", "pix_fmt": "yuv420p",
+        "options": {"preset": "10", "crf": "32"}},
+    "libaom_realtime": {
+        "codec": "libaom-av1", "pix_fmt": "yuv420p",
+        "options": {
+            "usage": "realtime", "cpu-used": "10", "crf": "35",
+            "row-mt": "1"}},
+    }
+# Tried in order by the auto profile, hardware encoders first.
+FALLBACK_ORDER = [
+    "av1_nvenc", "h264_nvenc", "libsvtav1_fast", "libx264_veryfast",
+    "libx264_ultrafast", "libaom_realtime"]
+
+# The camera MJPEG is muxed as it is, with the device timestamps in usec as
+# PTS, so nothing is decoded or encoded.
+MJPEG_PASSTHROUGH = "mjpeg_passthrough"
+DEVICE_TIME_BASE = Fraction(1, 1_000_000)
+
+
+@functools.cache
+def encoder_works(codec: str) -> bool:
+    # A codec can be built in while its hardware is missing, so the encoder
+    # is opened once on a small frame.
+    if codec not in av.codecs_available:
+        return False
+    try:
+        context = av.CodecContext.create(codec, "w")
+        context.width = 256
+        context.height = 256
+        context.pix_fmt = "yuv420p"
+        context.time_base = Fraction(1, 30)
+        context.open()
+    except (av.FFmpegError, ValueError):
+        return False
+
+    return True
+
+
+@functools.cache
+def encoder_pix_fmts(codec: str) -> frozenset[str]:
+    formats = av.Codec(codec, "w").video_formats or ()
+    return frozenset(f.name for f in formats)
+
+
+def available_codec_profiles() -> list[str]:
+    return [
+        name for name, profile in CODEC_PROFILES.items()
+        if encoder_works(profile["codec"])]
+
+
+def select_codec_profile(profile: str = "auto") -> str:
+    if profile == MJPEG_PASSTHROUGH:
+        return profile
+    if profile != "auto":
+        if profile not in CODEC_PROFILES:
+            raise ValueError(
+                f"Unknown codec profile '{profile}', available profiles: "
+                f"{', '.join([*CODEC_PROFILES, MJPEG_PASSTHROUGH])}.")
+        return profile
+    for name in FALLBACK_ORDER:
+        if encoder_works(CODEC_PROFILES[name]["codec"]):
+            return name
+    raise RuntimeError("No working video encoder found.")
+
+
+def add_video_stream(
+        container: av.container.OutputContainer, profile: str, fps: int,
+        width: int, height: int, thread_count: int = 0,
+        pix_fmt: str | None = None) -> av.VideoStream:
+    profile = CODEC_PROFILES[profile]
+    stream = container.add_stream(profile["codec"], rate=fps)
+    stream.width = width
+    stream.height = height
+    # Frames already in a format of the encoder are not converted.
+    stream.pix_fmt = profile["pix_fmt"]
+    if pix_fmt is not None and pix_fmt in encoder_pix_fmts(profile["codec"]):
+        stream.pix_fmt = pix_fmt
+    stream.options = dict(profile["options"])
+    # Frame and slice threading where the encoder supports them, 0 lets
+    # FFmpeg pick the thread count.
+    stream.codec_context.thread_type = "AUTO"
+    stream.codec_context.thread_count = thread_count
+
+    return stream
+
+
+def add_passthrough_stream(
+        container: av.container.OutputContainer, fps: int, width: int,
+        height: int) -> av.VideoStream:
+    stream = container.add_stream("mjpeg", rate=fps)
+    stream.width = width
+    stream.height = height
+    stream.pix_fmt = "yuvj422p"
+    stream.time_base = DEVICE_TIME_BASE
+
+    return stream
+
+
+def mjpeg_packet(stream: av.VideoStream, jpeg: bytes, pts: int) -> av.Packet:
+    packet = av.Packet(jpeg)
+    packet.pts = pts
+    packet.dts = pts
+    # The muxer changes the stream time base, so the packet keeps its own.
+    packet.time_base = DEVICE_TIME_BASE
+    packet.stream = stream
+    packet.is_keyframe = True
+
+    return packet
@@ -0,0 +1,44 @@
+import threading
+import queue
+import numpy as np
+from numpy import typing as npt
+
+
+class FramePool:
+    """
+    Bounded pool of preallocated frames.
+
+    A slot is acquired with one reference per consumer and goes back to the
+    pool when every consumer has released it.
+    """
+    def __init__(
+            self, n_slots: int, shape: tuple[int, ...],
+            dtype: npt.DTypeLike = np.uint8):
+        # np.zeros maps lazy zero pages, the explicit fill touches every
+        # page now so that no page fault is left for the hot path.
+        self.frames = np.empty((n_slots, *shape), dtype=dtype)
+        self.frames.fill(0)
+        self._refs = [0] * n_slots
+        self._lock = threading.Lock()
+        self._free = queue.SimpleQueue()
+        for slot in range(n_slots):
+            self._free.put(slot)
+
+    def __getitem__(self, slot: int) -> npt.NDArray:
+        return self.frames[slot]
+
+    def __len__(self) -> int:
+        return len(self._refs)
+
+    def acquire(self, n_refs: int = 1) -> int:
+        slot = self._free.get()
+        self._refs[slot] = n_refs
+
+        return slot
+
+    def release(self, slot: int):
+        with self._lock:
+            self._refs[slot] -= 1
+            if self._refs[slot] > 0:
+                return
+        self._free.put(slot)
@@ -0,0 +1,99 @@
+from collections import deque
+import time
+from typing import Any, Sequence
+import numpy as np
+from numpy import typing as npt
+
+# (frameset_idx, ts, items, present), missing devices have a None item.
+Frameset = tuple[int, int, list[Any], npt.NDArray[np.bool_]]
+
+
+class FrameSynchronizer:
+    """
+    Streaming grouping of per-device results into multi-device framesets.
+
+    Device timestamps are shifted by the subordinate delay of each device,
+    so they are only comparable between hardware-synced devices. Results
+    closer than window_usec to the earliest pending one make a frameset.
+    A device without pending results is waited for until that result has
+    been pending for max_wait_s of arrival time, or until max_pending
+    results are queued for another device, and is then marked as missing.
+    The wait is on arrival time, so a device whose results come through a
+    slower pipeline is still matched.
+    """
+    def __init__(
+            self, n_devices: int, delays_usec: Sequence[int] | None = None,
+            window_usec: int = 16_667, max_wait_s: float = 0.5,
+            max_pending: int = 30):
+        if delays_usec is None:
+            delays_usec = [0] * n_devices
+        self.n_devices = n_devices
+        self.delays_usec = [int(delay) for delay in delays_usec]
+        self.window_usec = window_usec
+        self.max_wait_s = max_wait_s
+        self.max_pending = max_pending
+
+        self.n_framesets = 0
+        self.n_missing = np.zeros(n_devices, dtype=np.int64)
+        self._pending = [deque() for _ in range(n_devices)]
+        self._closed = [False] * n_devices
+        self._last_arrival_s = None
+
+    def push(
+            self, device_id: int, ts: int, item: Any,
+            arrival_s: float | None = None) -> list[Frameset]:
+        # The arrival time defaults to now, replays can give their own.
+        if arrival_s is None:
+            arrival_s = time.perf_counter()
+        ts = int(ts) - self.delays_usec[device_id]
+        self._pending[device_id].append((ts, arrival_s, item))
+        self._last_arrival_s = arrival_s
+
+        return self._collect()
+
+    def close(self, device_id: int) -> list[Frameset]:
+        self._closed[device_id] = True
+
+        return self._collect()
+
+    def _collect(self) -> list[Frameset]:
+        framesets = []
+        while True:
+            heads = [
+                pending[0][0] if pending else None
+                for pending in self._pending]
+            if all(head is None for head in heads):
+                break
+            ref_device = min(
+                (head, i) for i, head in enumerate(heads)
+                if head is not None)[1]
+            ref_ts, ref_arrival_s, _ = self._pending[ref_device][0]
+
+            # Only an empty, still open device can add to this frameset.
+            waiting = any(
+                head is None and not closed
+                for head, closed in zip(heads, self._closed))
+            if waiting:
+                overflow = any(
+                    len(pending) >= self.max_pending
+                    for pending in self._pending)
+                expired = (
+                    self._last_arrival_s - ref_arrival_s >= self.max_wait_s)
+                if not (overflow or expired):
+                    break
+            framesets.append(self._pop(ref_ts))
+
+        return framesets
+
+    def _pop(self, ref_ts: int) -> Frameset:
+        items = [None] * self.n_devices
+        present = np.zeros(self.n_devices, dtype=np.bool_)
+        for i, pending in enumerate(self._pending):
+            if pending and pending[0][0] - ref_ts <= self.window_usec:
+                items[i] = pending.popleft()[2]
+                present[i] = True
+        self.n_missing += ~present
+        frameset = (self.n_framesets, ref_ts, items, present)
+        self.n_framesets += 1
+
+        return frameset
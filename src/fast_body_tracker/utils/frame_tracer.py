@@ -0,0 +1,136 @@
+import itertools
+import pathlib
+import threading
+import time
+import numpy as np
+from numpy import typing as npt
+import h5py
+
+# Stages of a frame in order. The exposure is the system timestamp of the
+# color image, the other stages are marked by the pipeline threads.
+TRACE_STAGES = ("exposure", "tracked", "computed", "encoded", "flushed")
+EVENT_DTYPE = np.dtype([
+    ("stage", np.uint8), ("device_id", np.int16), ("frame_idx", np.int64),
+    ("t_ns", np.int64)])
+
+
+class FrameTracer:
+    """
+    Per-frame timestamps of every pipeline stage.
+
+    Marks are appended to preallocated blocks. Each mark takes its row from
+    an itertools counter, which is atomic in CPython, so the threads never
+    wait on each other. Times come from perf_counter_ns, the clock of the
+    system timestamps of the SDK.
+    """
+    def __init__(self, block_size: int = 1 << 16):
+        self.block_size = block_size
+        self.enabled = False
+
+        self._blocks = []
+        self._counter = itertools.count()
+        self._n_events = 0
+        self._lock = threading.Lock()
+
+    def start(self):
+        self._blocks = []
+        self._counter = itertools.count()
+        self._n_events = 0
+        self.enabled = True
+
+    def stop(self):
+        # Every thread marking frames must be finished.
+        self.enabled = False
+        self._n_events = next(self._counter)
+
+    def mark(
+            self, stage: str, device_id: int, frame_idx: int,
+            t_ns: int | None = None):
+        if not self.enabled:
+            return
+        if t_ns is None:
+            t_ns = time.perf_counter_ns()
+        row = next(self._counter)
+        block_idx, row = divmod(row, self.block_size)
+        if block_idx >= len(self._blocks):
+            with self._lock:
+                while block_idx >= len(self._blocks):
+                    self._blocks.append(
+                        np.zeros(self.block_size, dtype=EVENT_DTYPE))
+        self._blocks[block_idx][row] = (
+            TRACE_STAGES.index(stage), device_id, frame_idx, t_ns)
+
+    def mark_many(
+            self, stage: str, device_id: int,
+            frame_idxs: npt.NDArray[np.int64], t_ns: int | None = None):
+        if t_ns is None:
+            t_ns = time.perf_counter_ns()
+        for frame_idx in frame_idxs:
+            self.mark(stage, device_id, int(frame_idx), t_ns)
+
+    def events(self) -> npt.NDArray:
+        if not self._blocks:
+            return np.zeros(0, dtype=EVENT_DTYPE)
+        return np.concatenate(self._blocks)[:self._n_events]
+
+    def table(self) -> tuple[
+            npt.NDArray[np.int16], npt.NDArray[np.int64],
+            npt.NDArray[np.int64]]:
+        # One row per frame, one column per stage, -1 for a missing stage.
+        events = self.events()
+        keys, inverse = np.unique(
+            events[["device_id", "frame_idx"]], return_inverse=True)
+        times = np.full((len(keys), len(TRACE_STAGES)), -1, dtype=np.int64)
+        times[inverse.ravel(), events["stage"]] = events["t_ns"]
+
+        return keys["device_id"], keys["frame_idx"], times
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        # Latency of every stage since the exposure, in ms.
+        _, _, times = self.table()
+        summary = {}
+        for k, stage in enumerate(TRACE_STAGES[1:], start=1):
+            valid = (times[:, 0] >= 0) & (times[:, k] >= 0)
+            latencies = (times[valid, k] - times[valid, 0]) / 1e6
+            if not len(latencies):
+                continue
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+            summary[stage] = {
+                "count": int(len(latencies)), "p50": float(p50),
+                "p95": float(p95), "p99": float(p99)}
+
+        return summary
+
+    def write(self, file_dir: pathlib.Path | str) -> str:
+        # Side table in trace.h5 and summary report in trace_summary.txt.
+        file_dir = pathlib.Path(file_dir)
+        device_ids, frame_idxs, times = self.table()
+        exposure = times[:, 0]
+        with h5py.File(file_dir / "trace.h5", "w") as h5file:
+            h5file.attrs["stages"] = list(TRACE_STAGES)
+            h5file.create_dataset("device_id", data=device_ids)
+            h5file.create_dataset("frame_idx", data=frame_idxs)
+            h5file.create_dataset("exposure_ns", data=exposure)
+            # Stage times in usec since the exposure, -1 when missing.
+            for k, stage in enumerate(TRACE_STAGES[1:], start=1):
+                valid = (exposure >= 0) & (times[:, k] >= 0)
+                latency = np.where(
+                    valid, (times[:, k] - exposure) // 1000, -1)
+                h5file.create_dataset(
+                    f"{stage}_us", data=latency.astype(np.int32))
+
+        lines = [f"{'stage':>10} {'frames':>8} {'p50 ms':>8} "
+                 f"{'p95 ms':>8} {'p99 ms':>8}"]
+        for stage, stats in self.summary().items():
+            lines.append(
+                f"{stage:>10} {stats['count']:8d} {stats['p50']:8.1f} "
+                f"{stats['p95']:8.1f} {stats['p99']:8.1f}")
+        report = "\n".join(lines) + "\n"
+        with open(file_dir / "trace_summary.txt", "w") as f:
+            f.write(report)
+
+        return report
+
+
+# Tracer of the pipeline threads, disabled until started.
+TRACER = FrameTracer()
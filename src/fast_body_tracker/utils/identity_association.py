@@ -0,0 +1,155 @@
+import numpy as np
+from numpy import typing as npt
+
+from ..k4abt.kabt_const import K4ABT_JOINT_COUNT
+from .skeleton_fusion import torso_centers
+
+
+def linear_sum_assignment(
+        cost: npt.NDArray[np.float64]) -> tuple[
+            npt.NDArray[np.intp], npt.NDArray[np.intp]]:
+    # Hungarian algorithm with potentials, O(n^2 m) for n <= m.
+    cost = np.asarray(cost, dtype=np.float64)
+    transposed = cost.shape[0] > cost.shape[1]
+    if transposed:
+        cost = cost.T
+    n, m = cost.shape
+    if n == 0:
+        empty = np.empty(0, dtype=np.intp)
+        return empty, empty
+
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    row_of = np.zeros(m + 1, dtype=np.intp)  # 1-based, 0 is unassigned.
+    way = np.zeros(m + 1, dtype=np.intp)
+    for i in range(1, n + 1):
+        row_of[0] = i
+        j0 = 0
+        min_v = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=np.bool_)
+        while True:
+            used[j0] = True
+            i0 = row_of[j0]
+            free = ~used[1:]
+            reduced = cost[i0 - 1] - u[i0] - v[1:]
+            better = free & (reduced < min_v[1:])
+            min_v[1:][better] = reduced[better]
+            way[1:][better] = j0
+            candidates = np.where(free, min_v[1:], np.inf)
+            j1 = int(np.argmin(candidates)) + 1
+            delta = candidates[j1 - 1]
+            u[row_of[used]] += delta
+            v[used] -= delta
+            min_v[1:][free] -= delta
+            j0 = j1
+            if row_of[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            row_of[j0] = row_of[j1]
+            j0 = j1
+
+    cols = np.flatnonzero(row_of[1:])
+    rows = row_of[1:][cols] - 1
+    if transposed:
+        rows, cols = cols, rows
+    order = np.argsort(rows)
+
+    return rows[order], cols[order]
+
+
+class IdentityAssociator:
+    """
+    Stable global person ids across devices and over time.
+
+    The bodies of each view are assigned to the known persons by optimal
+    assignment on the torso distances in the shared frame. Bodies farther
+    than max_distance_mm from every person start a new one, and persons
+    unseen for more than max_age framesets are forgotten.
+    """
+    def __init__(
+            self, max_distance_mm: float = 500.0, max_age: int = 30):
+        self.max_distance_mm = max_distance_mm
+        self.max_age = max_age
+
+        self.person_ids = np.empty(0, dtype=np.uint32)
+        self.centers = np.empty((0, 3), dtype=np.float64)
+        self.ages = np.empty(0, dtype=np.int64)
+        self._next_id = 0
+
+    def update(
+            self, views: list[tuple[npt.NDArray, npt.NDArray] | None]
+            ) -> tuple[
+                list[npt.NDArray[np.uint32] | None], npt.NDArray[np.uint32],
+                npt.NDArray[np.float32], npt.NDArray[np.uint8]]:
+        view_persons = []
+        sums = np.zeros_like(self.centers)
+        counts = np.zeros(len(self.centers), dtype=np.int64)
+        for view in views:
+            if view is None:
+                view_persons.append(None)
+                continue
+            centers = torso_centers(view[0]).astype(np.float64)
+            # Persons already seen in this frameset are matched against
+            # their current position.
+            seen = counts > 0
+            anchors = self.centers.copy()
+            anchors[seen] = sums[seen] / counts[seen, None]
+            cost = np.linalg.norm(
+                centers[:, None, :] - anchors[None, :, :], axis=-1)
+            gated = cost > self.max_distance_mm
+            cost[gated] = self.max_distance_mm * 1e3
+
+            persons = np.full(len(centers), -1, dtype=np.intp)
+            rows, cols = linear_sum_assignment(cost)
+            valid = ~gated[rows, cols]
+            persons[rows[valid]] = cols[valid]
+
+            new = np.flatnonzero(persons < 0)
+            if len(new):
+                persons[new] = len(self.centers) + np.arange(len(new))
+                self._add(centers[new])
+                sums = np.concatenate([sums, np.zeros((len(new), 3))])
+                counts = np.concatenate(
+                    [counts, np.zeros(len(new), dtype=np.int64)])
+            np.add.at(sums, persons, centers)
+            np.add.at(counts, persons, 1)
+            view_persons.append(persons)
+
+        # Persons are stacked in the order of their global ids.
+        seen = np.flatnonzero(counts > 0)
+        seen = seen[np.argsort(self.person_ids[seen])]
+        slot_of = np.full(len(self.centers), -1, dtype=np.intp)
+        slot_of[seen] = np.arange(len(seen))
+        positions = np.zeros(
+            (len(views), len(seen), K4ABT_JOINT_COUNT, 3), dtype=np.float32)
+        confidences = np.zeros(
+            (len(views), len(seen), K4ABT_JOINT_COUNT), dtype=np.uint8)
+        view_ids = []
+        for v, (view, persons) in enumerate(zip(views, view_persons)):
+            if view is None:
+                view_ids.append(None)
+                continue
+            positions[v, slot_of[persons]] = view[0]
+            confidences[v, slot_of[persons]] = view[1]
+            view_ids.append(self.person_ids[persons])
+        person_ids = self.person_ids[seen]
+
+        self.centers[seen] = sums[seen] / counts[seen, None]
+        self.ages += 1
+        self.ages[seen] = 0
+        alive = self.ages <= self.max_age
+        self.person_ids = self.person_ids[alive]
+        self.centers = self.centers[alive]
+        self.ages = self.ages[alive]
+
+        return view_ids, person_ids, positions, confidences
+
+    def _add(self, centers: npt.NDArray[np.float64]):
+        n = len(centers)
+        self.person_ids = np.concatenate([
+            self.person_ids,
+            np.arange(self._next_id, self._next_id + n, dtype=np.uint32)])
+        self.centers = np.concatenate([self.centers, centers])
+        self.ages = np.concatenate([self.ages, np.zeros(n, dtype=np.int64)])
+        self._next_id += n
@@ -0,0 +1,208 @@
+import mmap
+import pathlib
+from typing import Iterator
+import numpy as np
+
+from ..k4abt.kabt_const import K4ABT_JOINT_COUNT
+
+JOURNAL_MAGIC = b"FBTJRNL2"
+HEADER_DTYPE = np.dtype([
+    ("magic", "S8"), ("max_bodies", np.int32), ("n_joints", np.int32),
+    ("record_size", np.int64), ("capacity", np.int64),
+    ("n_committed", np.int64)
+    ])
+HEADER_SIZE = 4096
+
+
+def record_dtype(max_bodies: int) -> np.dtype:
+    return np.dtype([
+        ("seq", np.uint64), ("frame_idx", np.int64), ("ts", np.uint64),
+        ("system_ts", np.uint64), ("device_id", np.int32),
+        ("n_bodies", np.int32), ("interpolated", np.uint8),
+        ("ids", np.uint32, (max_bodies,)),
+        ("positions", np.float32, (max_bodies, K4ABT_JOINT_COUNT, 3)),
+        ("confidences", np.uint8, (max_bodies, K4ABT_JOINT_COUNT))
+        ])
+
+
+class _Segment:
+    def __init__(
+            self, path: pathlib.Path, max_bodies: int | None = None,
+            capacity: int | None = None, writable: bool = False):
+        if max_bodies is not None:
+            dtype = record_dtype(max_bodies)
+            with open(path, "wb") as f:
+                f.truncate(HEADER_SIZE + capacity * dtype.itemsize)
+        if path.stat().st_size < HEADER_SIZE:
+            raise ValueError(f"{path} is not a joint journal.")
+        self._file = open(path, "r+b" if writable else "rb")
+        self._mmap = mmap.mmap(
+            self._file.fileno(), 0,
+            access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+        self.header = np.ndarray(
+            (), dtype=HEADER_DTYPE, buffer=self._mmap)
+        if max_bodies is not None:
+            self.header["magic"] = JOURNAL_MAGIC
+            self.header["max_bodies"] = max_bodies
+            self.header["n_joints"] = K4ABT_JOINT_COUNT
+            self.header["record_size"] = dtype.itemsize
+            self.header["capacity"] = capacity
+            self.header["n_committed"] = 0
+        elif self.header["magic"] != JOURNAL_MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a joint journal.")
+
+        dtype = record_dtype(int(self.header["max_bodies"]))
+        capacity = min(
+            int(self.header["capacity"]),
+            (len(self._mmap) - HEADER_SIZE) // dtype.itemsize)
+        self.records = np.ndarray(
+            (capacity,), dtype=dtype, buffer=self._mmap, offset=HEADER_SIZE)
+
+    def close(self):
+        # The views must be dropped before the map is closed.
+        self.header = None
+        self.records = None
+        self._mmap.close()
+        self._file.close()
+
+    def flush(self):
+        self._mmap.flush()
+
+
+class JointJournal:
+    """
+    Append-only journal of joint records in preallocated memory maps.
+
+    Every record is copied into the map, then stamped with its sequence
+    number and committed in the segment header, so a record is either
+    complete or ignored after a crash. Segments are files of capacity
+    records, a new one is created when the current one is full.
+    """
+    def __init__(
+            self, journal_dir: pathlib.Path | str, max_bodies: int = 1,
+            capacity: int = 30*60*10):
+        self.journal_dir = pathlib.Path(journal_dir)
+        self.journal_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bodies = max_bodies
+        self.capacity = capacity
+
+        self.n_segments = 0
+        self.n_records = 0
+        self._segment = None
+        self._n = 0
+
+    def append(self, item: tuple):
+        if self._segment is None or self._n == self.capacity:
+            self._next_segment()
+        frame_idx, ts, system_ts, device_id, ids, positions, confidences = (
+            item[:7])
+        n_bodies = min(len(positions), self.max_bodies)
+
+        record = self._segment.records[self._n]
+        record["frame_idx"] = frame_idx
+        record["ts"] = ts
+        record["system_ts"] = system_ts
+        record["device_id"] = device_id
+        record["n_bodies"] = n_bodies
+        record["interpolated"] = len(item) > 7 and item[7]
+        record["ids"][:n_bodies] = ids[:n_bodies]
+        record["positions"][:n_bodies] = positions[:n_bodies]
+        record["confidences"][:n_bodies] = confidences[:n_bodies]
+        record["seq"] = self._n + 1
+        self._n += 1
+        self._segment.header["n_committed"] = self._n
+        self.n_records += 1
+
+    def close(self):
+        if self._segment is not None:
+            self._segment.flush()
+            self._segment.close()
+            self._segment = None
+
+    def _next_segment(self):
+        self.close()
+        path = self.journal_dir / f"journal_{self.n_segments:05d}.bin"
+        self._segment = _Segment(
+            path, self.max_bodies, self.capacity, writable=True)
+        self.n_segments += 1
+        self._n = 0
+
+
+def _segment_paths(journal_dir: pathlib.Path | str) -> list[pathlib.Path]:
+    return sorted(pathlib.Path(journal_dir).glob("journal_*.bin"))
+
+
+def _n_valid(records: np.ndarray) -> int:
+    # Records are valid while their sequence numbers are consecutive, the
+    # commit count in the header is not trusted.
+    expected = np.arange(1, len(records) + 1, dtype=np.uint64)
+    invalid = np.flatnonzero(records["seq"] != expected)
+
+    return int(invalid[0]) if len(invalid) else len(records)
+
+
+def read_journal(journal_dir: pathlib.Path | str) -> Iterator[tuple]:
+    for path in _segment_paths(journal_dir):
+        try:
+            segment = _Segment(path)
+        except ValueError as e:
+            print(f"Skipping segment: {e}")
+            continue
+        records = segment.records
+        try:
+            for k in range(int(segment.header["n_committed"])):
+                n_bodies = int(records["n_bodies"][k])
+                yield (
+                    int(records["frame_idx"][k]), int(records["ts"][k]),
+                    int(records["system_ts"][k]),
+                    int(records["device_id"][k]),
+                    records["ids"][k, :n_bodies].copy(),
+                    records["positions"][k, :n_bodies].copy(),
+                    records["confidences"][k, :n_bodies].copy(),
+                    bool(records["interpolated"][k]))
+        finally:
+            records = None
+            segment.close()
+
+
+def recover_journal(journal_dir: pathlib.Path | str) -> int:
+    n_records = 0
+    for path in _segment_paths(journal_dir):
+        try:
+            segment = _Segment(path, writable=True)
+        except ValueError as e:
+            print(f"Skipping segment: {e}")
+            continue
+        n_committed = int(segment.header["n_committed"])
+        n_valid = _n_valid(segment.records)
+        if n_valid != n_committed:
+            print(
+                f"{path.name}: {n_committed} committed records, "
+                f"{n_valid} recovered.")
+            segment.header["n_committed"] = n_valid
+            segment.flush()
+        segment.close()
+        n_records += n_valid
+
+    return n_records
+
+
+def journal_info(journal_dir: pathlib.Path | str) -> dict:
+    max_bodies = 0
+    device_ids = set()
+    n_records = 0
+    for path in _segment_paths(journal_dir):
+        try:
+            segment = _Segment(path)
+        except ValueError:
+            continue
+        n = int(segment.header["n_committed"])
+        max_bodies = max(max_bodies, int(segment.header["max_bodies"]))
+        device_ids.update(np.unique(segment.records["device_id"][:n]).tolist())
+        n_records += n
+        segment.close()
+
+    return {
+        "max_bodies": max_bodies, "device_ids": sorted(device_ids),
+        "n_records": n_records}
@@ -1,9 +1,11 @@
 import threading
-from pynput import keyboard
 
 
 class KeyboardCloser:
     def __init__(self):
+        # Imported here, pynput needs a display on Linux.
+        from pynput import keyboard
+
         self.stop_event = threading.Event()
         self.listener = keyboard.Listener(on_press=self.on_press)
 
@@ -17,5 +19,4 @@ class KeyboardCloser:
             pass
 
     def start(self):
-        listener = keyboard.Listener(on_press=self.on_press)
-        listener.start()
+        self.listener.start()
@@ -0,0 +1,214 @@
+from bisect import bisect_left
+import json
+import os
+import pathlib
+import queue
+import threading
+import time
+
+# Upper bounds in seconds of the latency histogram buckets.
+LATENCY_BUCKETS = (
+    0.001, 0.002, 0.005, 0.01, 0.02, 0.033, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0,
+    5.0)
+
+
+class Counter:
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, n: int = 1):
+        self.value += n
+
+
+class Gauge:
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value: float):
+        self.value = value
+
+
+class Histogram:
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        # The last count is for the values above every bucket.
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+
+class MetricsRegistry:
+    """
+    Counters, gauges and histograms labelled by pipeline stage and device.
+
+    Updates take no lock: every metric has a single writer, the thread of
+    its stage and device, and exporters only read the values. The lock
+    only guards the creation of metrics.
+    """
+    def __init__(self):
+        self._metrics = dict()
+        self._queues = dict()
+        self._lock = threading.Lock()
+
+    def counter(
+            self, name: str, stage: str, device: int | None = None) -> (
+                Counter):
+        return self._get(Counter, name, stage, device)
+
+    def gauge(
+            self, name: str, stage: str, device: int | None = None) -> Gauge:
+        return self._get(Gauge, name, stage, device)
+
+    def histogram(
+            self, name: str, stage: str, device: int | None = None) -> (
+                Histogram):
+        return self._get(Histogram, name, stage, device)
+
+    def watch_queue(
+            self, stage: str, watched_queue: queue.Queue,
+            device: int | None = None):
+        # The depth is sampled on every snapshot.
+        with self._lock:
+            self._queues[(stage, device)] = watched_queue
+
+    def clear(self):
+        with self._lock:
+            self._metrics.clear()
+            self._queues.clear()
+
+    def snapshot(self) -> list[dict]:
+        for (stage, device), watched_queue in list(self._queues.items()):
+            self.gauge("fbt_queue_depth", stage, device).set(
+                watched_queue.qsize())
+
+        rows = []
+        with self._lock:
+            metrics = list(self._metrics.items())
+        for (name, stage, device), metric in sorted(
+                metrics, key=lambda m: (m[0][0], m[0][1], str(m[0][2]))):
+            row = {
+                "name": name, "type": type(metric).__name__.lower(),
+                "stage": stage, "device": device}
+            if isinstance(metric, Histogram):
+                row["count"] = metric.count
+                row["sum"] = metric.sum
+                row["buckets"] = list(metric.buckets)
+                row["counts"] = list(metric.counts)
+            else:
+                row["value"] = metric.value
+            rows.append(row)
+
+        return rows
+
+    def to_prometheus(self, rows: list[dict] | None = None) -> str:
+        if rows is None:
+            rows = self.snapshot()
+        lines = []
+        typed = set()
+        for row in rows:
+            name = row["name"]
+            if name not in typed:
+                lines.append(f"# TYPE {name} {row['type']}")
+                typed.add(name)
+            labels = f'stage="{row["stage"]}"'
+            if row["device"] is not None:
+                labels += f',device="{row["device"]}"'
+            if row["type"] != "histogram":
+                lines.append(f"{name}{{{labels}}} {row['value']}")
+                continue
+            cumulative = 0
+            for bound, count in zip(
+                    [*row["buckets"], "+Inf"], row["counts"]):
+                cumulative += count
+                lines.append(
+                    f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"{name}_sum{{{labels}}} {row['sum']}")
+            lines.append(f"{name}_count{{{labels}}} {row['count']}")
+
+        return "\n".join(lines) + "\n"
+
+    def _get(self, cls: type, name: str, stage: str, device: int | None):
+        key = (name, stage, device)
+        metric = self._metrics.get(key)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.setdefault(key, cls())
+        return metric
+
+
+# Registry of the pipeline threads.
+REGISTRY = MetricsRegistry()
+
+
+class MetricsExporter:
+    """
+    Thread exporting a registry every interval.
+
+    Each export appends one JSON line to the JSON lines file and rewrites
+    the Prometheus text file, which can be read by the node exporter
+    textfile collector. With verbose, the frame rates and the new drops of
+    the interval are printed.
+    """
+    def __init__(
+            self, registry: MetricsRegistry = REGISTRY,
+            jsonl_path: pathlib.Path | str | None = None,
+            prometheus_path: pathlib.Path | str | None = None,
+            interval_s: float = 5.0, verbose: bool = True):
+        self.registry = registry
+        self.jsonl_path = jsonl_path
+        self.prometheus_path = prometheus_path
+        self.interval_s = interval_s
+        self.verbose = verbose
+
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._dropped = dict()
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._thread.join()
+        self.export()
+
+    def export(self):
+        rows = self.registry.snapshot()
+        if self.jsonl_path is not None:
+            with open(self.jsonl_path, "a") as f:
+                f.write(json.dumps({"time": time.time(), "metrics": rows}))
+                f.write("\n")
+        if self.prometheus_path is not None:
+            # Replaced atomically, a scraper never reads a partial file.
+            tmp_path = f"{self.prometheus_path}.tmp"
+            with open(tmp_path, "w") as f:
+                f.write(self.registry.to_prometheus(rows))
+            os.replace(tmp_path, self.prometheus_path)
+        if self.verbose:
+            self._print_summary(rows)
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval_s):
+            self.export()
+
+    def _print_summary(self, rows: list[dict]):
+        parts = []
+        for row in rows:
+            label = row["stage"]
+            if row["device"] is not None:
+                label += f"/{row['device']}"
+            if row["name"] == "fbt_fps":
+                parts.append(f"{label} {row['value']:.1f} fps")
+            elif row["name"] == "fbt_dropped_frames_total":
+                key = (row["stage"], row["device"])
+                new = row["value"] - self._dropped.get(key, 0)
+                self._dropped[key] = row["value"]
+                if new:
+                    parts.append(f"{label} dropped {new}")
+        if parts:
+            print(", ".join(parts))
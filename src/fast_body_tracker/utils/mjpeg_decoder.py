@@ -0,0 +1,66 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+import os
+import numpy as np
+from numpy import typing as npt
+import cv2
+
+DECODE_FLAGS = {
+    1: cv2.IMREAD_COLOR, 2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4, 8: cv2.IMREAD_REDUCED_COLOR_8}
+
+
+class MjpegDecoder:
+    """
+    Pool of threads decoding JPEG buffers to BGR images.
+
+    With a scale of 2, 4 or 8, libjpeg decodes directly at the reduced
+    size, which is several times cheaper than decoding and resizing.
+    OpenCV releases the GIL while decoding, so the cameras are decoded in
+    parallel.
+    """
+    def __init__(self, n_workers: int | None = None, scale: int = 1):
+        if scale not in DECODE_FLAGS:
+            raise ValueError(
+                f"Unsupported scale {scale}, supported scales: "
+                f"{', '.join(str(s) for s in DECODE_FLAGS)}.")
+        if n_workers is None:
+            n_workers = min(4, os.cpu_count() or 1)
+        self.scale = scale
+        self.flags = DECODE_FLAGS[scale]
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=n_workers, thread_name_prefix="mjpeg_decoder")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def output_shape(self, width: int, height: int) -> tuple[int, int, int]:
+        # libjpeg rounds the reduced sizes up.
+        return -(-height // self.scale), -(-width // self.scale), 3
+
+    def decode(
+            self, jpeg: bytes | npt.NDArray[np.uint8],
+            out: npt.NDArray[np.uint8] | None = None) -> npt.NDArray[
+                np.uint8]:
+        # The OpenCV bindings do not take a destination, so the image is
+        # copied into out when one is given.
+        image = cv2.imdecode(
+            np.frombuffer(jpeg, dtype=np.uint8), self.flags)
+        if image is None:
+            raise ValueError("Invalid JPEG buffer.")
+        if out is None:
+            return image
+        np.copyto(out, image)
+
+        return out
+
+    def submit(
+            self, jpeg: bytes | npt.NDArray[np.uint8],
+            out: npt.NDArray[np.uint8] | None = None) -> Future:
+        return self._executor.submit(self.decode, jpeg, out)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,46 @@
+import numpy as np
+from numpy import typing as npt
+import cv2
+
+
+class MosaicPreview:
+    """
+    Single window tiling the color images of every device.
+
+    Images are resized with INTER_AREA straight into preallocated tiles of
+    the mosaic, so a refresh costs the same whatever the camera count and
+    resolution.
+    """
+    def __init__(
+            self, n_devices: int, width: int = 1920, height: int = 1080,
+            mosaic_width: int = 1280,
+            window_name: str = "Color images with skeleton"):
+        self.window_name = window_name
+        self.n_cols = int(np.ceil(np.sqrt(n_devices)))
+        self.n_rows = -(-n_devices // self.n_cols)
+        self.tile_width = mosaic_width // self.n_cols
+        self.tile_height = round(self.tile_width * height / width)
+
+        self.mosaic = np.zeros(
+            (self.n_rows * self.tile_height, self.n_cols * self.tile_width,
+             3), dtype=np.uint8)
+        self.tiles = []
+        for i in range(n_devices):
+            row, col = divmod(i, self.n_cols)
+            self.tiles.append(self.mosaic[
+                row * self.tile_height:(row + 1) * self.tile_height,
+                col * self.tile_width:(col + 1) * self.tile_width])
+
+        cv2.namedWindow(self.window_name, cv2.WINDOW_AUTOSIZE)
+
+    def update(self, device_id: int, image: npt.NDArray[np.uint8]):
+        cv2.resize(
+            image, (self.tile_width, self.tile_height),
+            dst=self.tiles[device_id], interpolation=cv2.INTER_AREA)
+
+    def show(self) -> int:
+        cv2.imshow(self.window_name, self.mosaic)
+        return cv2.waitKey(1)
+
+    def close(self):
+        cv2.destroyWindow(self.window_name)
@@ -1,33 +1,80 @@
 import time
 
+from .metrics import REGISTRY
+
 
 class FrameRateCalculator:
-    def __init__(self):
+    def __init__(self, stage: str | None = None, device: int | None = None):
         self.frame_window = 30 * 10
         self.frame_count = 0
         self.start_time = None
+        # With a stage, the rate goes to the metrics registry instead of
+        # being printed.
+        self.frames = None
+        self.fps = None
+        if stage is not None:
+            self.frames = REGISTRY.counter("fbt_frames_total", stage, device)
+            self.fps = REGISTRY.gauge("fbt_fps", stage, device)
 
     def start(self):
         self.start_time = time.perf_counter()
 
     def update(self):
         self.frame_count += 1
+        if self.frames is not None:
+            self.frames.inc()
         if self.frame_count >= self.frame_window:
             end_time = time.perf_counter()
             elapsed_time = end_time - self.start_time
             fps = self.frame_count / elapsed_time
-            print(f"FPS: {fps:.2f}")
+            if self.fps is not None:
+                self.fps.set(fps)
+            else:
+                print(f"FPS: {fps:.2f}")
             self.start_time = time.perf_counter()
             self.frame_count = 0
 
 
 class DroppedFramesAlert:
-    def __init__(self):
+    def __init__(self, stage: str | None = None, device: int | None = None):
         self.frame_window = 30
         self.dropped_frame_count = 0
+        # With a stage, the drops are counted in the metrics registry
+        # instead of being printed.
+        self.dropped = None
+        if stage is not None:
+            self.dropped = REGISTRY.counter(
+                "fbt_dropped_frames_total", stage, device)
 
     def update(self):
+        if self.dropped is not None:
+            self.dropped.inc()
+            return
         self.dropped_frame_count += 1
         if self.dropped_frame_count >= self.frame_window:
             print("Dropping frames.")
             self.dropped_frame_count = 0
+
+
+class FlushMonitor:
+    def __init__(self):
+        self.n_flushes = 0
+        self.bytes_written = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    def update(self, elapsed_time: float, n_bytes: int):
+        self.n_flushes += 1
+        self.bytes_written += n_bytes
+        self.total_time += elapsed_time
+        self.max_time = max(self.max_time, elapsed_time)
+
+    def report(self):
+        if self.n_flushes == 0:
+            return
+        mean_time = self.total_time / self.n_flushes
+        print(
+            f"Flushes: {self.n_flushes}, "
+            f"written: {self.bytes_written / 1e6:.2f} MB, "
+            f"latency: {mean_time * 1e3:.1f} ms mean, "
+            f"{self.max_time * 1e3:.1f} ms max")
@@ -0,0 +1,218 @@
+import pathlib
+import numpy as np
+from numpy import typing as npt
+import h5py
+
+from .body_dataset import BodyDataset
+from .storage_profiles import dataset_options
+
+
+def fit_clock(
+        ts: h5py.Dataset, system_ts: h5py.Dataset, block_size: int = 100_000,
+        n_sigma: float = 3.0) -> tuple[float, float]:
+    # Linear map from the device clock (usec) to the host clock (nsec),
+    # fitted in chunks. Host timestamp spikes are removed by a second fit.
+    n = ts.shape[0]
+    x0 = float(ts[0])
+    y0 = float(system_ts[0])
+
+    def blocks():
+        for start in range(0, n, block_size):
+            x = ts[start:start + block_size].astype(np.float64) - x0
+            y = system_ts[start:start + block_size].astype(np.float64) - y0
+            yield x, y
+
+    def fit(slope=None, intercept=None, max_residual=None):
+        count = 0
+        sx = sy = sxx = sxy = 0.0
+        for x, y in blocks():
+            if max_residual is not None:
+                keep = np.abs(y - slope * x - intercept) <= max_residual
+                x = x[keep]
+                y = y[keep]
+            count += len(x)
+            sx += x.sum()
+            sy += y.sum()
+            sxx += (x * x).sum()
+            sxy += (x * y).sum()
+        denominator = count * sxx - sx * sx
+        slope = (count * sxy - sx * sy) / denominator
+        intercept = (sy - slope * sx) / count
+        return slope, intercept
+
+    slope, intercept = fit()
+    count = 0
+    squared = 0.0
+    for x, y in blocks():
+        count += len(x)
+        squared += ((y - slope * x - intercept) ** 2).sum()
+    sigma = np.sqrt(squared / count)
+    if sigma > 0:
+        slope, intercept = fit(slope, intercept, n_sigma * sigma)
+
+    return slope, y0 + intercept - slope * x0
+
+
+def slerp(
+        q0: npt.NDArray[np.float32], q1: npt.NDArray[np.float32],
+        w: npt.NDArray[np.float64]) -> npt.NDArray[np.float32]:
+    # Quaternions on the last axis, w broadcast over the leading axes.
+    q0 = q0.astype(np.float64)
+    q1 = q1.astype(np.float64)
+    dot = (q0 * q1).sum(axis=-1, keepdims=True)
+    q1 = np.where(dot < 0, -q1, q1)
+    dot = np.abs(dot)
+    w = w[..., None]
+
+    theta = np.arccos(np.clip(dot, -1.0, 1.0))
+    sin_theta = np.sin(theta)
+    close = sin_theta < 1e-6
+    safe = np.where(close, 1.0, sin_theta)
+    w0 = np.where(close, 1.0 - w, np.sin((1.0 - w) * theta) / safe)
+    w1 = np.where(close, w, np.sin(w * theta) / safe)
+    q = w0 * q0 + w1 * q1
+    q /= np.maximum(np.linalg.norm(q, axis=-1, keepdims=True), 1e-12)
+
+    return q.astype(np.float32)
+
+
+def _interpolate(
+        rows: dict[str, npt.NDArray], rows_t: npt.NDArray[np.float64],
+        grid_t: npt.NDArray[np.float64], max_gap_ns: float) -> dict[
+            str, npt.NDArray]:
+    n_grid = len(grid_t)
+    n_rows = len(rows_t)
+    n_joints = rows["positions"].shape[1]
+    if n_rows == 0:
+        return {
+            "positions": np.zeros((n_grid, n_joints, 3), dtype=np.float32),
+            "confidences": np.zeros((n_grid, n_joints), dtype=np.uint8),
+            "valid": np.zeros((n_grid, n_joints), dtype=np.bool_)}
+
+    # Each grid time lies between the last row at or before it and the
+    # next row, a row exactly on the grid is used on both sides.
+    right = np.searchsorted(rows_t, grid_t, side="right")
+    left = right - 1
+    exact = (left >= 0) & (rows_t[np.maximum(left, 0)] == grid_t)
+    right = np.where(exact, left, right)
+    inside = (left >= 0) & (right < n_rows)
+    left = np.clip(left, 0, n_rows - 1)
+    right = np.clip(right, 0, n_rows - 1)
+
+    t_left = rows_t[left]
+    t_right = rows_t[right]
+    span = t_right - t_left
+    w = np.divide(
+        grid_t - t_left, span, out=np.zeros_like(grid_t), where=span > 0)
+    inside &= span <= max_gap_ns
+    if "person_id" in rows:
+        inside &= rows["person_id"][left] == rows["person_id"][right]
+
+    p_left = rows["positions"][left]
+    p_right = rows["positions"][right]
+    positions = p_left + w[:, None, None] * (p_right - p_left)
+    confidences = np.minimum(
+        rows["confidences"][left], rows["confidences"][right])
+    valid = inside[:, None] & (confidences > 0)
+    aligned = {
+        "positions": np.where(valid[..., None], positions, 0.0).astype(
+            np.float32),
+        "confidences": np.where(valid, confidences, 0).astype(np.uint8),
+        "valid": valid}
+    if "orientations" in rows:
+        orientations = slerp(
+            rows["orientations"][left], rows["orientations"][right],
+            np.broadcast_to(w[:, None], valid.shape))
+        aligned["orientations"] = np.where(
+            valid[..., None], orientations, 0.0).astype(np.float32)
+
+    return aligned
+
+
+def align_session(
+        file_path: pathlib.Path | str, output_path: pathlib.Path | str,
+        fps: float = 30.0, max_gap_ms: float = 100.0, block_s: float = 10.0,
+        storage_profile: str = "none"):
+    period_ns = 1e9 / fps
+    max_gap_ns = max_gap_ms * 1e6
+    block_size = max(int(block_s * fps), 1)
+
+    with BodyDataset(file_path) as dataset, h5py.File(
+            output_path, "w", libver="latest") as h5file:
+        devices = [
+            device for device in dataset.devices if device != "fused"]
+        clocks = {}
+        starts = []
+        ends = []
+        for device in devices:
+            ts_grp = dataset.h5file[f"ts/device_{device}"]
+            if ts_grp["ts"].shape[0] < 2:
+                continue
+            slope, intercept = fit_clock(ts_grp["ts"], ts_grp["system_ts"])
+            clocks[device] = (slope, intercept)
+            starts.append(slope * float(ts_grp["ts"][0]) + intercept)
+            ends.append(slope * float(ts_grp["ts"][-1]) + intercept)
+        if not clocks:
+            return
+
+        # The common grid covers the time when every device was recording.
+        n_grid = max(int((min(ends) - max(starts)) // period_ns) + 1, 0)
+        grid_start = max(starts)
+        h5file.attrs["fps"] = fps
+        h5file.attrs["max_gap_ms"] = max_gap_ms
+        h5file.create_dataset(
+            "system_ts", **dataset_options(
+                storage_profile, (), "i8", block_size))
+
+        outputs = {}
+        for device, (slope, intercept) in clocks.items():
+            device_grp = h5file.create_group(f"device_{device}")
+            device_grp.attrs["device_id"] = device
+            # Host time in nsec = clock_slope * ts in usec + clock_intercept.
+            device_grp.attrs["clock_slope"] = slope
+            device_grp.attrs["clock_intercept"] = intercept
+            for body in dataset.bodies(device):
+                body_grp = device_grp.create_group(f"body_{body}")
+                source_grp = dataset.h5file[
+                    f"joints/device_{device}/body_{body}"]
+                n_joints = source_grp["positions"].shape[1]
+                shapes = {
+                    "positions": ((n_joints, 3), "f4"),
+                    "confidences": ((n_joints,), "u1"),
+                    "valid": ((n_joints,), "?")}
+                if "orientations" in source_grp:
+                    shapes["orientations"] = ((n_joints, 4), "f4")
+                for name, (shape, dtype) in shapes.items():
+                    body_grp.create_dataset(name, **dataset_options(
+                        storage_profile, shape, dtype, block_size))
+                outputs[(device, body)] = body_grp
+
+        for block_start in range(0, n_grid, block_size):
+            block_end = min(block_start + block_size, n_grid)
+            grid_t = grid_start + period_ns * np.arange(
+                block_start, block_end, dtype=np.float64)
+            _append(h5file["system_ts"], np.round(grid_t).astype(np.int64))
+
+            for (device, body), body_grp in outputs.items():
+                slope, intercept = clocks[device]
+                t_start = int(np.floor(
+                    (grid_t[0] - max_gap_ns - intercept) / slope))
+                t_end = int(np.ceil(
+                    (grid_t[-1] + max_gap_ns - intercept) / slope)) + 1
+                rows = dataset.query(device, body, t_start, t_end)
+                rows_t = slope * rows["ts"].astype(np.float64) + intercept
+
+                aligned = _interpolate(rows, rows_t, grid_t, max_gap_ns)
+                for name, output in body_grp.items():
+                    data = aligned.get(name)
+                    if data is None:
+                        data = np.zeros(
+                            (len(grid_t), *output.shape[1:]),
+                            dtype=output.dtype)
+                    _append(output, data)
+
+
+def _append(dataset: h5py.Dataset, data: npt.NDArray):
+    old_n = dataset.shape[0]
+    dataset.resize(old_n + len(data), axis=0)
+    dataset[old_n:] = data
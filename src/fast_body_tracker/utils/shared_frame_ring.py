@@ -0,0 +1,125 @@
+import os
+import queue
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+
+from ..k4abt.kabt_const import K4ABT_JOINT_COUNT
+
+META_DTYPE = np.dtype([
+    ("frame_idx", np.int64), ("ts", np.uint64), ("system_ts", np.uint64),
+    ("n_bodies", np.int32)
+    ])
+
+
+class SharedFrameRing:
+    """
+    Fixed pool of BGR frames and joint arrays in shared memory.
+
+    The producer process acquires a free slot, writes into the slot views and
+    publishes it. The consumer gets the published slot, reads it and releases
+    it. Only slot indices travel through the queues. When every slot is
+    taken, the producer reuses the oldest published slot (drop oldest).
+    """
+    def __init__(
+            self, n_slots: int, height: int, width: int, n_bodies: int = 1,
+            ctx: mp.context.BaseContext | None = None):
+        if ctx is None:
+            ctx = mp.get_context()
+        self.n_slots = n_slots
+        self.height = height
+        self.width = width
+        self.n_bodies = n_bodies
+
+        self._shm = shared_memory.SharedMemory(
+            create=True, size=self._nbytes())
+        self._owner_pid = os.getpid()
+        self._free = ctx.Queue()
+        self._ready = ctx.Queue()
+        for slot in range(n_slots):
+            self._free.put(slot)
+        self._map()
+
+    def __getstate__(self):
+        return {
+            "n_slots": self.n_slots, "height": self.height,
+            "width": self.width, "n_bodies": self.n_bodies,
+            "name": self._shm.name, "owner_pid": self._owner_pid,
+            "free": self._free, "ready": self._ready}
+
+    def __setstate__(self, state):
+        self.n_slots = state["n_slots"]
+        self.height = state["height"]
+        self.width = state["width"]
+        self.n_bodies = state["n_bodies"]
+        self._shm = shared_memory.SharedMemory(name=state["name"])
+        self._owner_pid = state["owner_pid"]
+        self._free = state["free"]
+        self._ready = state["ready"]
+        self._map()
+
+    def acquire(self, timeout: float = 0.005) -> tuple[int, bool]:
+        # Items put in a multiprocessing queue become visible with a small
+        # delay, so keep polling both queues instead of blocking on one.
+        while True:
+            try:
+                return self._free.get(timeout=timeout), False
+            except queue.Empty:
+                pass
+            try:
+                return self._ready.get_nowait(), True
+            except queue.Empty:
+                pass
+
+    def publish(self, slot: int):
+        self._ready.put(slot)
+
+    def close_writer(self):
+        self._ready.put(None)
+
+    def get(self, timeout: float | None = None) -> int | None:
+        return self._ready.get(timeout=timeout)
+
+    def release(self, slot: int):
+        self._free.put(slot)
+
+    def close(self):
+        # The views must be dropped before the shared memory is closed.
+        self.images = None
+        self.meta = None
+        self.ids = None
+        self.positions = None
+        self.confidences = None
+        self._shm.close()
+        if os.getpid() == self._owner_pid:
+            self._shm.unlink()
+
+    def _layout(self) -> list[tuple[str, tuple[int, ...], np.dtype]]:
+        n = self.n_slots
+        return [
+            ("images", (n, self.height, self.width, 3), np.dtype(np.uint8)),
+            ("meta", (n,), META_DTYPE),
+            ("ids", (n, self.n_bodies), np.dtype(np.uint32)),
+            ("positions", (n, self.n_bodies, K4ABT_JOINT_COUNT, 3),
+             np.dtype(np.float32)),
+            ("confidences", (n, self.n_bodies, K4ABT_JOINT_COUNT),
+             np.dtype(np.uint8))]
+
+    def _nbytes(self) -> int:
+        nbytes = 0
+        for _, shape, dtype in self._layout():
+            nbytes = _align(nbytes) + int(np.prod(shape)) * dtype.itemsize
+
+        return nbytes
+
+    def _map(self):
+        offset = 0
+        for name, shape, dtype in self._layout():
+            offset = _align(offset)
+            setattr(self, name, np.ndarray(
+                shape, dtype=dtype, buffer=self._shm.buf, offset=offset))
+            offset += int(np.prod(shape)) * dtype.itemsize
+
+
+def _align(offset: int, alignment: int = 64) -> int:
+    return (offset + alignment - 1) // alignment * alignment
@@ -0,0 +1,49 @@
+import warnings
+import numpy as np
+from numpy import typing as npt
+
+from ..k4abt.kabt_const import (
+    K4ABT_JOINT_PELVIS, K4ABT_JOINT_SPINE_NAVEL, K4ABT_JOINT_SPINE_CHEST)
+
+# Indexed by K4ABT_JOINT_CONFIDENCE_*, NONE joints are never used.
+CONFIDENCE_WEIGHTS = np.array([0.0, 1.0, 2.0, 3.0], dtype=np.float32)
+TORSO_JOINTS = [
+    K4ABT_JOINT_PELVIS, K4ABT_JOINT_SPINE_NAVEL, K4ABT_JOINT_SPINE_CHEST]
+
+
+def torso_centers(
+        positions: npt.NDArray[np.float32]) -> npt.NDArray[np.float32]:
+    return positions[..., TORSO_JOINTS, :].mean(axis=-2)
+
+
+def fuse_skeletons(
+        positions: npt.NDArray[np.float32],
+        confidences: npt.NDArray[np.uint8],
+        outlier_mm: float = 150.0) -> tuple[
+            npt.NDArray[np.float32], npt.NDArray[np.uint8]]:
+    # Inputs are (n_views, n_persons, n_joints, ...), every joint of every
+    # person is fused at once.
+    weights = CONFIDENCE_WEIGHTS[confidences]
+    valid = weights > 0
+
+    # Views too far from the median of the valid views are rejected.
+    masked = np.where(valid[..., None], positions, np.nan)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        median = np.nanmedian(masked, axis=0)
+    distances = np.linalg.norm(positions - median, axis=-1)
+    kept = valid & (distances <= outlier_mm)
+    # When every view disagrees, keep the most confident ones.
+    best = valid & (weights == weights.max(axis=0))
+    kept = np.where(kept.any(axis=0), kept, best)
+
+    kept_weights = np.where(kept, weights, 0.0)
+    total = kept_weights.sum(axis=0)
+    fused_positions = (
+        (kept_weights[..., None] * positions).sum(axis=0)
+        / np.maximum(total, 1e-6)[..., None])
+    fused_confidences = np.where(kept, confidences, 0).max(axis=0)
+
+    return (
+        fused_positions.astype(np.float32),
+        fused_confidences.astype(np.uint8))
@@ -0,0 +1,59 @@
+import numpy as np
+from numpy import typing as npt
+
+try:
+    import hdf5plugin
+except ImportError:
+    hdf5plugin = None
+
+# Around 256 KiB chunks keep time range reads to a few chunks per dataset,
+# while the chunk cache still holds the chunk being appended to.
+CHUNK_BYTES = 256 * 1024
+
+STORAGE_PROFILES = {
+    "none": {},
+    "lzf": {"compression": "lzf", "shuffle": True},
+    "gzip": {"compression": "gzip", "compression_opts": 4, "shuffle": True},
+    }
+if hdf5plugin is not None:
+    STORAGE_PROFILES["blosc_lz4"] = dict(hdf5plugin.Blosc(
+        cname="lz4", clevel=5, shuffle=hdf5plugin.Blosc.SHUFFLE))
+    STORAGE_PROFILES["blosc_zstd"] = dict(hdf5plugin.Blosc(
+        cname="zstd", clevel=3, shuffle=hdf5plugin.Blosc.SHUFFLE))
+
+
+def chunk_rows(
+        row_shape: tuple[int, ...], dtype: npt.DTypeLike,
+        flush_size: int) -> int:
+    # A divisor of flush_size, so that a buffer flushed full writes whole
+    # chunks. A set is flushed as soon as any of its buffers is full, the
+    # other buffers end on a partial chunk that the next flush rewrites.
+    row_bytes = int(np.prod(row_shape, dtype=np.int64)) * (
+        np.dtype(dtype).itemsize)
+    max_rows = max(1, CHUNK_BYTES // row_bytes)
+    if max_rows >= flush_size:
+        return flush_size
+    for rows in range(max_rows, 0, -1):
+        if flush_size % rows == 0:
+            return rows
+
+    return 1
+
+
+def check_storage_profile(profile: str):
+    if profile not in STORAGE_PROFILES:
+        raise ValueError(
+            f"Unknown storage profile '{profile}', available profiles: "
+            f"{', '.join(STORAGE_PROFILES)}. Blosc profiles need hdf5plugin.")
+
+
+def dataset_options(
+        profile: str, row_shape: tuple[int, ...], dtype: npt.DTypeLike,
+        flush_size: int) -> dict:
+    check_storage_profile(profile)
+    rows = chunk_rows(row_shape, dtype, flush_size)
+
+    return {
+        "shape": (0, *row_shape), "maxshape": (None, *row_shape),
+        "dtype": dtype, "chunks": (rows, *row_shape),
+        **STORAGE_PROFILES[profile]}
@@ -0,0 +1,62 @@
+import math
+import time
+
+
+class TrackingDecimator:
+    """
+    Adaptive stride of the captures fed to the body tracker.
+
+    The time the capture thread is held by the tracker calls of a tracked
+    capture is compared to the frame budget, the camera period times the
+    stride. Above the headroom, the stride grows at once to fit the budget.
+    Once the budget of a smaller stride has been met for the cooldown, the
+    stride is lowered by one. With captures in flight the held time hides
+    part of the inference, so lowering the stride also probes the tracker
+    again.
+    """
+    def __init__(
+            self, fps: float = 30.0, max_stride: int = 3,
+            headroom: float = 0.8, smoothing: float = 0.2,
+            cooldown_s: float = 2.0):
+        if max_stride < 1:
+            raise ValueError("The maximum stride must be at least 1.")
+        self.period_s = 1.0 / fps
+        self.max_stride = max_stride
+        self.headroom = headroom
+        self.smoothing = smoothing
+        self.cooldown_s = cooldown_s
+
+        self.stride = 1
+        self.tracker_s = 0.0
+        self._n_skipped = 0
+        self._calm_since = None
+
+    @property
+    def load(self) -> float:
+        # Fraction of the frame budget taken by the tracker.
+        return self.tracker_s / (self.stride * self.period_s)
+
+    def track_next(self) -> bool:
+        if self._n_skipped + 1 >= self.stride:
+            self._n_skipped = 0
+            return True
+        self._n_skipped += 1
+        return False
+
+    def update(self, tracker_s: float):
+        self.tracker_s += self.smoothing * (tracker_s - self.tracker_s)
+        budget_s = self.period_s * self.headroom
+        if self.tracker_s > self.stride * budget_s:
+            self.stride = min(
+                self.max_stride, math.ceil(self.tracker_s / budget_s))
+            self._calm_since = None
+        elif self.stride > 1 and self.tracker_s <= (
+                (self.stride - 1) * budget_s):
+            now = time.perf_counter()
+            if self._calm_since is None:
+                self._calm_since = now
+            elif now - self._calm_since >= self.cooldown_s:
+                self.stride -= 1
+                self._calm_since = None
+        else:
+            self._calm_since = None
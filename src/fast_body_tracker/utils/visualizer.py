@@ -1,11 +1,13 @@
 import numpy as np
 from time import perf_counter
-from vispy import scene
-from vispy.scene.visuals import Markers, Text, Line, GridLines
 
 
 class PointCloudVisualizer:
     def __init__(self):
+        # Imported here, vispy needs a display.
+        from vispy import scene
+        from vispy.scene.visuals import Markers, Text
+
         self.canvas = scene.SceneCanvas(
             keys="interactive", show=True, title="Point cloud", vsync=False)
         self.view = self.canvas.central_widget.add_view()
@@ -57,6 +59,9 @@ class PointCloudVisualizer:
 
 class IMUVisualizer:
     def __init__(self, max_samples=400):
+        from vispy import scene
+        from vispy.scene.visuals import GridLines, Line, Text
+
         self.max_samples = max_samples
         self.canvas = scene.SceneCanvas(
             keys="interactive", show=True, title="IMU data", vsync=False)
@@ -0,0 +1,50 @@
+import numpy as np
+from numpy import typing as npt
+import cv2
+import av
+
+from ..k4a.k4a_const import (
+    K4A_IMAGE_FORMAT_COLOR_NV12, K4A_IMAGE_FORMAT_COLOR_YUY2)
+
+YUV_FORMATS = (K4A_IMAGE_FORMAT_COLOR_NV12, K4A_IMAGE_FORMAT_COLOR_YUY2)
+
+
+def yuv_video_frame(
+        yuv: npt.NDArray[np.uint8], color_format: int) -> av.VideoFrame:
+    # NV12 as (height * 3 / 2, width), YUY2 as (height, width, 2).
+    if color_format == K4A_IMAGE_FORMAT_COLOR_NV12:
+        if yuv.flags.c_contiguous:
+            # No copy, the frame keeps the image buffer alive.
+            return av.VideoFrame.from_numpy_buffer(yuv, format="nv12")
+        return av.VideoFrame.from_ndarray(yuv, format="nv12")
+    # PyAV cannot wrap packed YUYV, the frame is a single copy.
+    return av.VideoFrame.from_ndarray(yuv, format="yuyv422")
+
+
+def yuv_preview(
+        yuv: npt.NDArray[np.uint8], color_format: int, scale: int = 1,
+        out: npt.NDArray[np.uint8] | None = None) -> npt.NDArray[np.uint8]:
+    if color_format == K4A_IMAGE_FORMAT_COLOR_NV12:
+        height = yuv.shape[0] * 2 // 3
+        width = yuv.shape[1]
+        code = cv2.COLOR_YUV2BGR_NV12
+        y = yuv[:height]
+        uv = yuv[height:].reshape(height // 2, width // 2, 2)
+    else:
+        height, width = yuv.shape[:2]
+        code = cv2.COLOR_YUV2BGR_YUY2
+        y = yuv[..., 0]
+        uv = yuv.reshape(height, width // 2, 4)[..., 1::2]
+    if scale == 1:
+        return cv2.cvtColor(yuv, code, dst=out)
+
+    # The planes are reduced to a small NV12 image first, so that only the
+    # preview pixels are converted to BGR.
+    width //= scale
+    height //= scale
+    y = cv2.resize(y, (width, height), interpolation=cv2.INTER_AREA)
+    uv = cv2.resize(
+        uv, (width // 2, height // 2), interpolation=cv2.INTER_AREA)
+    nv12 = np.concatenate([y, uv.reshape(height // 2, width)])
+
+    return cv2.cvtColor(nv12, cv2.COLOR_YUV2BGR_NV12, dst=out)